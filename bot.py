@@ -5,12 +5,17 @@
 يحتوي على جميع handlers والمنطق الأساسي للبوت
 """
 
+from __future__ import annotations
+
+import re
 import sys
+import json
 import logging
+import threading
 import time
-import asyncio
-from datetime import datetime
-from typing import Optional, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Dict, Any, Callable, Hashable
 
 # حل مشكلة encoding في Windows
 if sys.platform.startswith('win'):
@@ -20,19 +25,24 @@ if sys.platform.startswith('win'):
     if sys.stderr.encoding != 'utf-8':
         sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-from telebot import TeleBot, types
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from telebot import TeleBot, types, apihelper, custom_filters
 from telebot.handler_backends import State, StatesGroup
-from telebot.storage import StateMemoryStorage
+from telebot.storage import StateRedisStorage
+from telebot.storage.base_storage import StateStorageBase, StateContext
 
 from config import Config, get_bot_link
 from database import (
     UserDatabase, SectionDatabase, StudentDatabase,
     AssignmentDatabase, NotificationDatabase, ActivityDatabase,
-    StatisticsDatabase, SettingsDatabase, get_academic_levels, get_subjects
+    StatisticsDatabase, SettingsDatabase, get_academic_levels, get_academic_level,
+    get_subjects
 )
 from helpers import (
     CodeGenerator, DateTimeHelper, MessageFormatter,
-    Validator, PermissionChecker
+    Validator, PermissionChecker, TokenBucket
 )
 
 # إعداد نظام السجلات
@@ -46,9 +56,161 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+# ==================== تخزين الحالات ====================
+
+class ExpiringStateMemoryStorage(StateStorageBase):
+    """
+    تخزين حالات المحادثة في الذاكرة مع حذف الحالات المتروكة
+    
+    كل حالة مخزنة في قاموس واحد مسطح بدلاً من القاموس المتداخل
+    {chat_id: {user_id: ...}} في StateMemoryStorage، فكل عملية بحث واحد.
+    كل وصول إلى حالة مستخدم يجدد وقتها، والحالات التي لم تُستخدم خلال
+    ttl_seconds تُحذف عند الوصول إليها أو في المسح الدوري.
+    """
+    
+    def __init__(self, ttl_seconds: int, sweep_interval_seconds: int = 60) -> None:
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # المفتاح user_id في المحادثات الخاصة (chat_id == user_id) وإلا (chat_id, user_id)
+        # القيمة [الحالة, البيانات, وقت آخر وصول]
+        self._entries: Dict[Hashable, list] = {}
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(chat_id, user_id) -> Hashable:
+        """مفتاح الحالة (معرف المستخدم وحده في المحادثات الخاصة)"""
+        return user_id if chat_id == user_id else (chat_id, user_id)
+    
+    def _get_entry(self, chat_id, user_id) -> Optional[list]:
+        """
+        جلب حالة المستخدم مع تجديد وقتها، وحذفها إذا كانت منتهية
+        
+        Returns:
+            [الحالة, البيانات, وقت آخر وصول] أو None
+        """
+        now = time.monotonic()
+        key = self._key(chat_id, user_id)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[2] > self.ttl_seconds:
+                    del self._entries[key]
+                    entry = None
+                else:
+                    entry[2] = now
+            
+            if now - self._last_sweep > self.sweep_interval_seconds:
+                self._last_sweep = now
+                stale = [
+                    k for k, (_, _, accessed) in self._entries.items()
+                    if now - accessed > self.ttl_seconds
+                ]
+                for k in stale:
+                    del self._entries[k]
+        
+        return entry
+    
+    def set_state(self, chat_id, user_id, state):
+        if hasattr(state, 'name'):
+            state = state.name
+        
+        entry = self._get_entry(chat_id, user_id)
+        if entry is None:
+            with self._lock:
+                self._entries[self._key(chat_id, user_id)] = [state, {}, time.monotonic()]
+        else:
+            entry[0] = state
+        return True
+    
+    def delete_state(self, chat_id, user_id):
+        with self._lock:
+            return self._entries.pop(self._key(chat_id, user_id), None) is not None
+    
+    def get_state(self, chat_id, user_id):
+        entry = self._get_entry(chat_id, user_id)
+        return entry[0] if entry is not None else None
+    
+    def get_data(self, chat_id, user_id):
+        entry = self._get_entry(chat_id, user_id)
+        return entry[1] if entry is not None else None
+    
+    def reset_data(self, chat_id, user_id):
+        entry = self._get_entry(chat_id, user_id)
+        if entry is None:
+            return False
+        entry[1] = {}
+        return True
+    
+    def set_data(self, chat_id, user_id, key, value):
+        entry = self._get_entry(chat_id, user_id)
+        if entry is None:
+            raise RuntimeError(f'chat_id {chat_id} and user_id {user_id} does not exist')
+        entry[1][key] = value
+        return True
+    
+    def get_interactive_data(self, chat_id, user_id):
+        return StateContext(self, chat_id, user_id)
+    
+    def save(self, chat_id, user_id, data):
+        entry = self._get_entry(chat_id, user_id)
+        if entry is not None:
+            entry[1] = data
+
+
 # إنشاء البوت
-state_storage = StateMemoryStorage()
-bot = TeleBot(Config.BOT_TOKEN, state_storage=state_storage)
+# التأكد من BOT_TOKEN و OWNER_TELEGRAM_ID قبل إنشاء البوت
+Config.require_runtime()
+
+# حالات المحادثة في Redis عند ضبط REDIS_URL (لتشغيل عدة نسخ)، وإلا في الذاكرة
+if Config.REDIS_URL:
+    state_storage = StateRedisStorage(
+        redis_url=Config.REDIS_URL,
+        prefix=Config.REDIS_STATE_PREFIX
+    )
+else:
+    state_storage = ExpiringStateMemoryStorage(Config.STATE_TTL_SECONDS)
+# المعالجات تعمل في مجمّع خيوط TeleBot، فاستدعاء قاعدة بيانات بطيء يحجز خيطاً واحداً
+# بينما تستمر بقية الخيوط في معالجة التحديثات
+bot = TeleBot(
+    Config.BOT_TOKEN,
+    state_storage=state_storage,
+    num_threads=Config.BOT_NUM_THREADS
+)
+
+# تفعيل فلتر الحالات حتى تعمل المعالجات المسجلة بـ state=
+bot.add_custom_filter(custom_filters.StateFilter(bot))
+
+# جلسة HTTPS واحدة مشتركة بين كل الخيوط تبقى مفتوحة طوال عمر العملية،
+# مع مجمّع اتصالات يتسع لكل خيوط المعالجة والإشعارات والبث
+# (اتصالات TLS مع خوادم تلغرام تُعاد استخدامها بدلاً من مصافحة جديدة)
+apihelper.SESSION_TIME_TO_LIVE = None
+apihelper.session = requests.Session()
+apihelper.session.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=Config.BOT_NUM_THREADS + Config.NOTIFICATION_BATCH_SIZE + 2,
+    # إعادة المحاولة عند فشل الاتصال فقط (الطلب لم يصل لتلغرام فلا تكرار للرسائل)
+    max_retries=Retry(total=None, connect=2, read=0, redirect=0, status=0, backoff_factor=0.1)
+))
+
+# محدد معدل مشترك لكل الإرسال الجماعي (البث، الرسائل الطويلة، إشعارات الأدمن)
+send_rate_limiter = TokenBucket(Config.TELEGRAM_MAX_MESSAGES_PER_SECOND)
+
+# مجمّع خيوط إرسال الإشعارات (عدد الخيوط = الحد الأقصى للإرسال المتزامن)
+notification_executor = ThreadPoolExecutor(
+    max_workers=Config.NOTIFICATION_BATCH_SIZE,
+    thread_name_prefix='notifier'
+)
+
+# خيط خلفي لتنفيذ عمليات البث خارج خيوط معالجة التحديثات
+# (عامل واحد: البثّات تُنفّذ بالتتابع فلا يتجاوز مجموعها حد تلغرام)
+broadcast_executor = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix='broadcast'
+)
 
 
 # ==================== حالات المحادثة ====================
@@ -94,9 +256,23 @@ def get_user_info(message: types.Message) -> Dict[str, Any]:
     }
 
 
-def create_main_keyboard(user_type: str) -> types.ReplyKeyboardMarkup:
+def get_state_data(user_id: int, chat_id: int) -> Dict[str, Any]:
     """
-    إنشاء لوحة المفاتيح الرئيسية حسب نوع المستخدم
+    قراءة بيانات الحالة دون نسخها وإعادة حفظها (للقراءة فقط)
+    
+    Args:
+        user_id: معرف المستخدم
+        chat_id: معرف المحادثة
+    
+    Returns:
+        بيانات الحالة أو قاموس فارغ إذا لم توجد حالة
+    """
+    return bot.current_states.get_data(chat_id, user_id) or {}
+
+
+def _build_main_keyboard(user_type: str) -> types.ReplyKeyboardMarkup:
+    """
+    بناء لوحة المفاتيح الرئيسية حسب نوع المستخدم
     
     Args:
         user_type: نوع المستخدم (owner/admin/student)
@@ -106,24 +282,289 @@ def create_main_keyboard(user_type: str) -> types.ReplyKeyboardMarkup:
     """
     keyboard = types.ReplyKeyboardMarkup(resize_keyboard=True)
     
-    if user_type == 'owner':
-        for row in Config.Keyboards.OWNER_MAIN:
-            keyboard.row(*[types.KeyboardButton(btn) for btn in row])
+    for row in Config.Keyboards.MAIN_BY_USER_TYPE.get(user_type, []):
+        keyboard.row(*[types.KeyboardButton(btn) for btn in row])
     
-    elif user_type == 'admin':
-        for row in Config.Keyboards.ADMIN_MAIN:
-            keyboard.row(*[types.KeyboardButton(btn) for btn in row])
+    return keyboard
+
+
+# لوحات المفاتيح الرئيسية تُبنى وتُحوَّل إلى JSON مرة واحدة عند تحميل الوحدة
+# (telebot يمرر reply_markup النصي كما هو دون إعادة تحويله في كل إرسال)
+_MAIN_KEYBOARDS: Dict[str, str] = {
+    user_type: _build_main_keyboard(user_type).to_json()
+    for user_type in Config.Keyboards.MAIN_BY_USER_TYPE
+}
+
+# لوحة فارغة لأنواع المستخدمين غير المعروفة
+_EMPTY_KEYBOARD = _build_main_keyboard('').to_json()
+
+
+def create_main_keyboard(user_type: str) -> str:
+    """
+    الحصول على لوحة المفاتيح الرئيسية حسب نوع المستخدم
     
-    elif user_type == 'student':
-        for row in Config.Keyboards.STUDENT_MAIN:
-            keyboard.row(*[types.KeyboardButton(btn) for btn in row])
+    Args:
+        user_type: نوع المستخدم (owner/admin/student)
     
-    return keyboard
+    Returns:
+        لوحة المفاتيح بصيغة JSON جاهزة للإرسال
+    """
+    return _MAIN_KEYBOARDS.get(user_type, _EMPTY_KEYBOARD)
+
+
+def _build_inline_menu(rows: list) -> types.InlineKeyboardMarkup:
+    """
+    بناء قائمة أزرار Inline من صفوف (نص الزر، بيانات الزر)
+    
+    Args:
+        rows: قائمة الصفوف
+    
+    Returns:
+        لوحة الأزرار
+    """
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    for row in rows:
+        markup.add(*[
+            types.InlineKeyboardButton(text, callback_data=data)
+            for text, data in row
+        ])
+    return markup
+
+
+# رسالة الترحيب وأزرار /start لكل نوع مستخدم، تُبنى مرة واحدة عند تحميل الوحدة
+_START_MENUS: Dict[str, tuple] = {
+    'owner': (Config.Messages.WELCOME_OWNER, _build_inline_menu([
+        [("➕ إنشاء شعبة", "owner_create_section"), ("📋 عرض الشعب", "owner_list_sections")],
+        [("📊 الإحصائيات", "owner_statistics"), ("⚙️ الإعدادات", "owner_settings")]
+    ])),
+    'admin': (Config.Messages.WELCOME_ADMIN, _build_inline_menu([
+        [("➕ نشر واجب", "admin_create_assignment"), ("📝 الواجبات", "admin_list_assignments")],
+        [("👥 إدارة الطلاب", "admin_manage_students"), ("⏳ الطلبات المعلقة", "admin_pending_requests")]
+    ])),
+    'student': (Config.Messages.WELCOME_STUDENT, _build_inline_menu([
+        [("📚 واجباتي", "student_my_assignments"), ("ℹ️ معلومات الشعبة", "student_section_info")]
+    ]))
+}
+
+
+# آخر لوحة لاختيار المرحلة الدراسية مع المراحل التي بُنيت منها
+_levels_keyboard_cache: Dict[str, Any] = {'levels': None, 'markup': None}
+
+
+def create_levels_keyboard(levels: list) -> types.InlineKeyboardMarkup:
+    """
+    الحصول على أزرار اختيار المرحلة الدراسية (تُعاد بناؤها فقط عند تغيّر المراحل)
+    
+    Args:
+        levels: قائمة المراحل الدراسية
+    
+    Returns:
+        لوحة أزرار Inline
+    """
+    levels_key = tuple((level['level_id'], level['level_name']) for level in levels)
+    
+    if _levels_keyboard_cache['levels'] != levels_key:
+        markup = types.InlineKeyboardMarkup(row_width=1)
+        for level_id, level_name in levels_key:
+            markup.add(types.InlineKeyboardButton(
+                level_name,
+                callback_data=f"create_sec_level_{level_id}"
+            ))
+        markup.add(types.InlineKeyboardButton("❌ إلغاء", callback_data="create_sec_cancel"))
+        
+        _levels_keyboard_cache['markup'] = markup
+        _levels_keyboard_cache['levels'] = levels_key
+    
+    return _levels_keyboard_cache['markup']
+
+
+# أزرار الموافقة/الرفض مُسلسلة إلى JSON مرة واحدة، ولا يتغير فيها سوى المعرّفات
+_APPROVAL_MARKUP_TEMPLATE = json.dumps({
+    'inline_keyboard': [[
+        {'text': "✅ موافقة", 'callback_data': "a:%d:%d"},
+        {'text': "❌ رفض", 'callback_data': "r:%d:%d"}
+    ]]
+}, ensure_ascii=False)
+
+
+def create_approval_markup(student_telegram_id: int, section_id: int) -> str:
+    """
+    إنشاء أزرار الموافقة/الرفض على طلب تسجيل
+    
+    البيانات بصيغة مختصرة: a:<معرف الطالب>:<معرف الشعبة> و r:<...>:<...>
+    
+    Args:
+        student_telegram_id: معرف تلغرام للطالب
+        section_id: معرف الشعبة
+    
+    Returns:
+        لوحة أزرار Inline بصيغة JSON جاهزة للإرسال
+    """
+    return _APPROVAL_MARKUP_TEMPLATE % (
+        student_telegram_id, section_id, student_telegram_id, section_id
+    )
+
+
+def create_batch_approval_markup(requests: list) -> types.InlineKeyboardMarkup:
+    """
+    إنشاء أزرار موافقة/رفض لعدة طلبات، صف لكل طالب
+    
+    Args:
+        requests: قائمة الطلبات (full_name, telegram_id, section_id)
+    
+    Returns:
+        لوحة أزرار Inline
+    """
+    markup = types.InlineKeyboardMarkup()
+    for request in requests:
+        markup.row(
+            types.InlineKeyboardButton(
+                f"✅ {request['full_name']}",
+                callback_data=f"a:{request['telegram_id']}:{request['section_id']}"
+            ),
+            types.InlineKeyboardButton(
+                f"❌ {request['full_name']}",
+                callback_data=f"r:{request['telegram_id']}:{request['section_id']}"
+            )
+        )
+    return markup
+
+
+def remove_decided_request_row(
+    markup: Optional[types.InlineKeyboardMarkup],
+    student_telegram_id: int,
+    section_id: int
+) -> tuple:
+    """
+    حذف صف الطالب الذي تم البت في طلبه من رسالة طلبات مجمّعة
+    
+    Args:
+        markup: أزرار الرسالة الحالية
+        student_telegram_id: معرف تلغرام للطالب
+        section_id: معرف الشعبة
+    
+    Returns:
+        (الأزرار المتبقية أو None، اسم الطالب من الزر أو None)
+    """
+    if not markup or len(markup.keyboard) <= 1:
+        return None, None
+    
+    suffix = f":{student_telegram_id}:{section_id}"
+    remaining = types.InlineKeyboardMarkup()
+    student_label = None
+    
+    for row in markup.keyboard:
+        if any((button.callback_data or '').endswith(suffix) for button in row):
+            student_label = row[0].text[2:]
+        else:
+            remaining.row(*row)
+    
+    return (remaining if remaining.keyboard else None), student_label
+
+
+def call_with_flood_retry(method: Callable, chat_id: int, *args, **kwargs) -> Any:
+    """
+    استدعاء دالة إرسال مع إعادة المحاولة فقط عند تجاوز حد الإرسال (خطأ 429)
+    
+    كل محاولة تنتظر رمزاً من send_rate_limiter فلا يتجاوز مجموع الإرسال حد تلغرام
+    
+    Args:
+        method: دالة الإرسال (مثل bot.send_message أو bot.copy_message)
+        chat_id: معرف المحادثة
+        *args, **kwargs: بقية معاملات دالة الإرسال
+    
+    Returns:
+        نتيجة دالة الإرسال
+    """
+    attempts = max(1, Config.NOTIFICATION_RETRY_ATTEMPTS)
+    
+    for attempt in range(attempts):
+        send_rate_limiter.acquire()
+        try:
+            return method(chat_id, *args, **kwargs)
+        except apihelper.ApiTelegramException as e:
+            if e.error_code != 429 or attempt == attempts - 1:
+                raise
+            
+            # الانتظار المدة التي يطلبها تلغرام فقط
+            retry_after = e.result_json.get('parameters', {}).get('retry_after', 1)
+            logger.warning("⏳ تجاوز حد الإرسال للمحادثة %s، إعادة المحاولة بعد %s ثانية", chat_id, retry_after)
+            time.sleep(retry_after)
+
+
+def send_message_with_retry(chat_id: int, text: str, **kwargs) -> types.Message:
+    """
+    إرسال رسالة مع إعادة المحاولة فقط عند تجاوز حد الإرسال (خطأ 429)
+    
+    Args:
+        chat_id: معرف المحادثة
+        text: نص الرسالة
+        **kwargs: معاملات إضافية لـ send_message
+    
+    Returns:
+        الرسالة المرسلة
+    """
+    return call_with_flood_retry(bot.send_message, chat_id, text, **kwargs)
+
+
+def _utf16_len(text: str) -> int:
+    """
+    طول النص بوحدات UTF-16 (وحدة قياس حد طول الرسالة في تلغرام)
+    
+    الحروف العربية وحدة واحدة، وأغلب الرموز التعبيرية وحدتان
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _split_message_text(text: str, limit: int) -> list:
+    """
+    تقسيم نص طويل إلى أجزاء لا يتجاوز كل منها limit وحدة UTF-16
+    
+    التقسيم عند نهايات الأسطر، ولا يُقطع السطر إلا إذا كان أطول من رسالة كاملة
+    
+    Args:
+        text: النص
+        limit: الحد الأقصى لطول الجزء
+    
+    Returns:
+        قائمة الأجزاء بالترتيب
+    """
+    parts = []
+    current = []
+    current_length = 0
+    
+    for line in text.splitlines(keepends=True):
+        line_length = _utf16_len(line)
+        
+        if current and current_length + line_length > limit:
+            parts.append(''.join(current))
+            current = []
+            current_length = 0
+        
+        if line_length <= limit:
+            current.append(line)
+            current_length += line_length
+            continue
+        
+        # سطر أطول من رسالة كاملة: يُقطع حرفاً حرفاً دون فصل أزواج UTF-16
+        for char in line:
+            width = 2 if ord(char) > 0xFFFF else 1
+            if current_length + width > limit:
+                parts.append(''.join(current))
+                current = []
+                current_length = 0
+            current.append(char)
+            current_length += width
+    
+    if current:
+        parts.append(''.join(current))
+    
+    return parts
 
 
 def send_long_message(chat_id: int, text: str) -> None:
     """
-    إرسال رسالة طويلة مع التقسيم التلقائي
+    إرسال رسالة طويلة مع التقسيم التلقائي عند نهايات الأسطر
     
     Args:
         chat_id: معرف المحادثة
@@ -131,13 +572,90 @@ def send_long_message(chat_id: int, text: str) -> None:
     """
     max_length = Config.MAX_MESSAGE_LENGTH
     
-    if len(text) <= max_length:
-        bot.send_message(chat_id, text)
+    if _utf16_len(text) <= max_length:
+        send_message_with_retry(chat_id, text)
     else:
-        parts = [text[i:i+max_length] for i in range(0, len(text), max_length)]
-        for part in parts:
-            bot.send_message(chat_id, part)
-            time.sleep(0.1)  # تأخير صغير بين الرسائل
+        for part in _split_message_text(text, max_length):
+            send_message_with_retry(chat_id, part)
+
+
+# فاصل بين عناصر القوائم (يُبنى مرة واحدة)
+_SEP = "─" * 30 + "\n\n"
+
+
+def send_message_blocks(chat_id: int, blocks: list) -> None:
+    """
+    إرسال مجموعة مقاطع نصية بأقل عدد ممكن من الرسائل
+    
+    تُجمع المقاطع المتتالية في رسالة واحدة ما دام طولها (بوحدات UTF-16) لا يتجاوز
+    الحد الأقصى، ولا يُقسم أي مقطع إلا إذا كان أطول من رسالة كاملة.
+    
+    Args:
+        chat_id: معرف المحادثة
+        blocks: قائمة المقاطع النصية بالترتيب
+    """
+    max_length = Config.MAX_MESSAGE_LENGTH
+    pending = []
+    pending_length = 0
+    
+    for block in blocks:
+        block_length = _utf16_len(block)
+        
+        if pending and pending_length + block_length > max_length:
+            send_long_message(chat_id, ''.join(pending))
+            pending = []
+            pending_length = 0
+        
+        pending.append(block)
+        pending_length += block_length
+    
+    if pending:
+        send_long_message(chat_id, ''.join(pending))
+
+
+@lru_cache(maxsize=64)
+def _render_sections_list(rows: tuple) -> tuple:
+    """
+    بناء مقاطع قائمة الشعب (تُحفظ النتيجة حسب محتوى الشعب نفسه)
+    
+    Args:
+        rows: صفوف (اسم الشعبة, اسم الأدمن, كود التسجيل)
+    
+    Returns:
+        المقاطع النصية بالترتيب
+    """
+    blocks = ["📋 قائمة الشعب:\n\n"]
+    
+    for section_name, admin_name, join_code in rows:
+        admin_line = f"👨‍💼 الأدمن: {admin_name}\n" if admin_name else ""
+        blocks.append(
+            f"🏷️ {section_name}\n"
+            f"{admin_line}"
+            f"🔗 رابط التسجيل:\n{get_bot_link(join_code)}\n"
+            f"{_SEP}"
+        )
+    
+    return tuple(blocks)
+
+
+def format_sections_list(sections: list) -> list:
+    """
+    تنسيق قائمة الشعب كمقاطع جاهزة لـ send_message_blocks
+    
+    الضغط المتكرر على زر عرض الشعب دون تغيير في الشعب يعيد نفس المقاطع
+    من الذاكرة المؤقتة بدلاً من إعادة تنسيقها
+    
+    Args:
+        sections: قائمة الشعب
+    
+    Returns:
+        قائمة المقاطع النصية
+    """
+    rows = tuple(
+        (section['section_name'], section.get('admin_name'), section['join_code'])
+        for section in sections
+    )
+    return list(_render_sections_list(rows))
 
 
 def check_permission(telegram_id: int, required_type: str) -> tuple[bool, Optional[str]]:
@@ -151,13 +669,105 @@ def check_permission(telegram_id: int, required_type: str) -> tuple[bool, Option
     Returns:
         (لديه صلاحية: bool, سبب الرفض: str أو None)
     """
-    return PermissionChecker.check_user_permission(
-        Config.DB_PATH, telegram_id, required_type
+    # المستخدم من الذاكرة المؤقتة بدلاً من فتح اتصال جديد بقاعدة البيانات
+    return PermissionChecker.check_user_record_permission(
+        UserDatabase.get_user(telegram_id), required_type
     )
 
 
+# ==================== موجّه الأزرار ====================
+
+# أزرار لوحة المفاتيح: نص الزر -> المعالج
+TEXT_ROUTES: Dict[str, Callable[[types.Message], None]] = {}
+
+# أزرار Inline ثابتة: callback_data -> المعالج
+CALLBACK_ROUTES: Dict[str, Callable[[types.CallbackQuery], None]] = {}
+
+# أزرار Inline تحمل بيانات: البادئة (قبل أول ':' أو قبل أول/آخر '_') -> المعالج
+# يستقبل المعالج البادئة وبقية البيانات بعد الفاصل حتى لا يعيد تحليلها
+CALLBACK_PREFIX_ROUTES: Dict[str, Callable[[types.CallbackQuery, str, str], None]] = {}
+
+
+def text_route(text: str):
+    """
+    تسجيل معالج لزر من أزرار لوحة المفاتيح
+    
+    Args:
+        text: نص الزر
+    """
+    def decorator(handler):
+        TEXT_ROUTES[text] = handler
+        return handler
+    return decorator
+
+
+def callback_route(data: str):
+    """
+    تسجيل معالج لزر Inline ببيانات ثابتة
+    
+    Args:
+        data: قيمة callback_data
+    """
+    def decorator(handler):
+        CALLBACK_ROUTES[data] = handler
+        return handler
+    return decorator
+
+
+def callback_prefix_route(prefix: str):
+    """
+    تسجيل معالج لزر Inline تبدأ بياناته ببادئة معينة
+    
+    Args:
+        prefix: البادئة بدون الفاصل (مثل a أو create_sec_level)
+    """
+    def decorator(handler):
+        CALLBACK_PREFIX_ROUTES[prefix] = handler
+        return handler
+    return decorator
+
+
+@bot.message_handler(func=lambda message: message.text in TEXT_ROUTES)
+def dispatch_text_button(message: types.Message):
+    """توجيه أزرار لوحة المفاتيح إلى معالجاتها"""
+    TEXT_ROUTES[message.text](message)
+
+
+# func=None: telebot يتجاوز الفلتر كلياً بدلاً من استدعاء lambda لكل ضغطة
+@bot.callback_query_handler(func=None)
+def dispatch_callback(call: types.CallbackQuery):
+    """توجيه أزرار Inline إلى معالجاتها (بحث في القاموس ثم بالبادئة)"""
+    data = call.data or ''
+    handler = CALLBACK_ROUTES.get(data)
+    
+    if handler is not None:
+        handler(call)
+        return
+    
+    prefix, separator, rest = data.partition(':')
+    if separator:
+        handler = CALLBACK_PREFIX_ROUTES.get(prefix)
+    else:
+        prefix, _, rest = data.rpartition('_')
+        handler = CALLBACK_PREFIX_ROUTES.get(prefix)
+        if handler is None:
+            prefix, _, rest = data.partition('_')
+            handler = CALLBACK_PREFIX_ROUTES.get(prefix)
+    
+    if handler is None:
+        logger.warning("⚠️ زر غير معروف: %s", data)
+        bot.answer_callback_query(call.id)
+        return
+    
+    handler(call, prefix, rest)
+
+
 # ==================== معالجات الأوامر الأساسية ====================
 
+# /start مع كود شعبة صالح (نفس نمط Validator.validate_section_code) في مرور واحد
+_START_CODE_RE = re.compile(r'/start(?:@\w+)?\s+(SEC_[a-zA-Z0-9]{12})\s*', re.ASCII)
+
+
 @bot.message_handler(commands=['start'])
 def handle_start(message: types.Message):
     """معالج أمر /start"""
@@ -165,21 +775,18 @@ def handle_start(message: types.Message):
         user_info = get_user_info(message)
         telegram_id = user_info['telegram_id']
         
-        logger.info(f"📩 أمر /start من المستخدم: {telegram_id}")
+        logger.debug("📩 أمر /start من المستخدم: %s", telegram_id)
         
         # التحقق من وجود كود الشعبة في الأمر
-        if len(message.text.split()) > 1:
-            code = message.text.split()[1]
-            
-            # التحقق من صحة الكود
-            if Validator.validate_section_code(code):
-                handle_registration_link(message, code)
-                return
+        match = _START_CODE_RE.fullmatch(message.text)
+        if match:
+            handle_registration_link(message, match.group(1))
+            return
         
-        # الحصول على معلومات المستخدم من قاعدة البيانات
-        user = UserDatabase.get_user(telegram_id)
+        # نوع المستخدم وحالة الحظر فقط (بدون جلب الصف كاملاً)
+        user_status = UserDatabase.get_user_status(telegram_id)
         
-        if not user:
+        if not user_status:
             # مستخدم جديد
             bot.send_message(
                 message.chat.id,
@@ -187,8 +794,10 @@ def handle_start(message: types.Message):
             )
             return
         
+        user_type, is_blocked = user_status
+        
         # التحقق من الحظر
-        if user['is_blocked']:
+        if is_blocked:
             bot.send_message(
                 message.chat.id,
                 Config.Messages.ERROR_BLOCKED
@@ -196,43 +805,9 @@ def handle_start(message: types.Message):
             return
         
         # إرسال الرسالة الترحيبية حسب نوع المستخدم
-        user_type = user['user_type']
-        
-        if user_type == 'owner':
-            welcome_message = Config.Messages.WELCOME_OWNER
-            # إنشاء Inline Keyboard للمالك
-            markup = types.InlineKeyboardMarkup(row_width=2)
-            markup.add(
-                types.InlineKeyboardButton("➕ إنشاء شعبة", callback_data="owner_create_section"),
-                types.InlineKeyboardButton("📋 عرض الشعب", callback_data="owner_list_sections")
-            )
-            markup.add(
-                types.InlineKeyboardButton("📊 الإحصائيات", callback_data="owner_statistics"),
-                types.InlineKeyboardButton("⚙️ الإعدادات", callback_data="owner_settings")
-            )
-        elif user_type == 'admin':
-            welcome_message = Config.Messages.WELCOME_ADMIN
-            # إنشاء Inline Keyboard للأدمن
-            markup = types.InlineKeyboardMarkup(row_width=2)
-            markup.add(
-                types.InlineKeyboardButton("➕ نشر واجب", callback_data="admin_create_assignment"),
-                types.InlineKeyboardButton("📝 الواجبات", callback_data="admin_list_assignments")
-            )
-            markup.add(
-                types.InlineKeyboardButton("👥 إدارة الطلاب", callback_data="admin_manage_students"),
-                types.InlineKeyboardButton("⏳ الطلبات المعلقة", callback_data="admin_pending_requests")
-            )
-        elif user_type == 'student':
-            welcome_message = Config.Messages.WELCOME_STUDENT
-            # إنشاء Inline Keyboard للطالب
-            markup = types.InlineKeyboardMarkup(row_width=2)
-            markup.add(
-                types.InlineKeyboardButton("📚 واجباتي", callback_data="student_my_assignments"),
-                types.InlineKeyboardButton("ℹ️ معلومات الشعبة", callback_data="student_section_info")
-            )
-        else:
-            welcome_message = Config.Messages.WELCOME_NEW_USER
-            markup = None
+        welcome_message, markup = _START_MENUS.get(
+            user_type, (Config.Messages.WELCOME_NEW_USER, None)
+        )
         
         bot.send_message(
             message.chat.id,
@@ -241,23 +816,15 @@ def handle_start(message: types.Message):
         )
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة /start: {e}")
+        logger.error("❌ خطأ في معالجة /start: %s", e)
         bot.send_message(
             message.chat.id,
             Config.Messages.ERROR_GENERAL
         )
 
 
-@bot.message_handler(commands=['help'])
-def handle_help(message: types.Message):
-    """معالج أمر /help"""
-    try:
-        user_info = get_user_info(message)
-        telegram_id = user_info['telegram_id']
-        
-        user = UserDatabase.get_user(telegram_id)
-        
-        help_text = """
+# نصوص المساعدة تُجمع مرة واحدة عند تحميل الوحدة
+_HELP_HEADER = """
 🆘 مساعدة البوت
 
 📚 الأوامر المتاحة:
@@ -267,46 +834,51 @@ def handle_help(message: types.Message):
 /cancel - إلغاء العملية الحالية
 
 """
-        
-        if user:
-            user_type = user['user_type']
-            
-            if user_type == 'owner':
-                help_text += """
+
+_HELP_FOOTER = """
+💡 للاستفسارات، تواصل مع الأدمن.
+"""
+
+_HELP_TEXTS: Dict[str, str] = {
+    'owner': _HELP_HEADER + """
 👑 أوامر المالك:
 • إنشاء شعبة جديدة
 • عرض جميع الشعب
 • إدارة الأدمنز
 • عرض الإحصائيات الشاملة
 • إدارة الإعدادات
-"""
-            
-            elif user_type == 'admin':
-                help_text += """
+""" + _HELP_FOOTER,
+    'admin': _HELP_HEADER + """
 👨‍💼 أوامر الأدمن:
 • نشر واجب جديد
 • تعديل/حذف الواجبات
 • إدارة الطلاب
 • الموافقة على طلبات التسجيل
 • عرض إحصائيات الشعبة
-"""
-            
-            elif user_type == 'student':
-                help_text += """
+""" + _HELP_FOOTER,
+    'student': _HELP_HEADER + """
 👨‍🎓 ميزات الطالب:
 • استلام إشعارات الواجبات
 • عرض واجباتي
 • عرض معلومات الشعبة
-"""
-        
-        help_text += """
-💡 للاستفسارات، تواصل مع الأدمن.
-"""
+""" + _HELP_FOOTER
+}
+
+# نص المساعدة لغير المسجلين
+_HELP_GUEST = _HELP_HEADER + _HELP_FOOTER
+
+
+@bot.message_handler(commands=['help'])
+def handle_help(message: types.Message):
+    """معالج أمر /help"""
+    try:
+        user_status = UserDatabase.get_user_status(message.from_user.id)
+        user_type = user_status[0] if user_status else None
         
-        bot.send_message(message.chat.id, help_text)
+        bot.send_message(message.chat.id, _HELP_TEXTS.get(user_type, _HELP_GUEST))
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة /help: {e}")
+        logger.error("❌ خطأ في معالجة /help: %s", e)
 
 
 @bot.message_handler(commands=['myid'])
@@ -317,7 +889,7 @@ def handle_myid(message: types.Message):
         telegram_id = user_info['telegram_id']
         username = user_info['username']
         
-        logger.info(f"📩 أمر /myid من المستخدم: {telegram_id}")
+        logger.debug("📩 أمر /myid من المستخدم: %s", telegram_id)
         
         myid_text = f"""
 🆔 معلومات حسابك:
@@ -336,7 +908,7 @@ def handle_myid(message: types.Message):
         )
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة /myid: {e}")
+        logger.error("❌ خطأ في معالجة /myid: %s", e)
         bot.send_message(
             message.chat.id,
             Config.Messages.ERROR_GENERAL
@@ -366,7 +938,7 @@ def handle_cancel(message: types.Message):
             )
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة /cancel: {e}")
+        logger.error("❌ خطأ في معالجة /cancel: %s", e)
 
 
 # ==================== معالجات التسجيل ====================
@@ -424,16 +996,141 @@ def handle_registration_link(message: types.Message, code: str):
             message.chat.id
         )
         
-        with bot.retrieve_data(message.from_user.id, message.chat.id) as data:
-            data['section_code'] = code
-            data['section_name'] = section['section_name']
+        # بيانات الشعبة والأدمن تُحفظ هنا حتى لا يُعاد جلبها عند إرسال الاسم
+        bot.add_data(
+            message.from_user.id,
+            message.chat.id,
+            section_code=code,
+            section_id=section['section_id'],
+            section_name=section['section_name'],
+            admin_telegram_id=section['admin_telegram_id']
+        )
+        
+    except Exception as e:
+        logger.error("❌ خطأ في معالجة رابط التسجيل: %s", e)
+        bot.send_message(
+            message.chat.id,
+            Config.Messages.ERROR_GENERAL
+        )
+
+
+class AdminNotificationBatcher:
+    """
+    تجميع طلبات التسجيل لكل أدمن وإرسالها في رسالة واحدة
+    
+    أول طلب يبدأ مهلة flush_seconds، وكل ما يصل خلالها يُرسل معه.
+    تُرسل المجموعة فوراً إذا بلغت max_items.
+    """
+    
+    def __init__(self, flush_seconds: float, max_items: int) -> None:
+        self.flush_seconds = flush_seconds
+        self.max_items = max(1, max_items)
+        self._pending: Dict[int, list] = {}
+        self._timers: Dict[int, threading.Timer] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, admin_telegram_id: int, request: Dict[str, Any]) -> None:
+        """
+        إضافة طلب تسجيل إلى قائمة انتظار الأدمن
+        
+        Args:
+            admin_telegram_id: معرف تلغرام للأدمن
+            request: بيانات الطلب (full_name, username, telegram_id, section_id, section_name)
+        """
+        with self._lock:
+            pending = self._pending.setdefault(admin_telegram_id, [])
+            pending.append(request)
+            
+            flush_now = len(pending) >= self.max_items
+            if not flush_now and admin_telegram_id not in self._timers:
+                timer = threading.Timer(self.flush_seconds, self.flush, (admin_telegram_id,))
+                timer.daemon = True
+                self._timers[admin_telegram_id] = timer
+                timer.start()
+        
+        if flush_now:
+            self.flush(admin_telegram_id)
+    
+    def flush(self, admin_telegram_id: int) -> None:
+        """
+        إرسال جميع الطلبات المنتظرة لأدمن معين
+        
+        Args:
+            admin_telegram_id: معرف تلغرام للأدمن
+        """
+        with self._lock:
+            requests = self._pending.pop(admin_telegram_id, [])
+            timer = self._timers.pop(admin_telegram_id, None)
+        
+        if timer:
+            timer.cancel()
+        
+        if not requests:
+            return
+        
+        try:
+            if len(requests) == 1:
+                request = requests[0]
+                text = MessageFormatter.format_registration_request_message(
+                    full_name=request['full_name'],
+                    username=request['username'],
+                    telegram_id=request['telegram_id'],
+                    section_name=request['section_name']
+                )
+                markup = create_approval_markup(request['telegram_id'], request['section_id'])
+            else:
+                text = MessageFormatter.format_registration_batch_message(requests)
+                markup = create_batch_approval_markup(requests)
+            
+            send_message_with_retry(admin_telegram_id, text, reply_markup=markup)
+        
+        except Exception as e:
+            logger.error("❌ خطأ في إرسال إشعار للأدمن: %s", e)
+
+
+admin_notifier = AdminNotificationBatcher(
+    Config.ADMIN_NOTIFICATION_FLUSH_SECONDS,
+    Config.ADMIN_NOTIFICATION_MAX_BATCH
+)
+
+
+def notify_admin_of_registration(
+    state_data: Dict[str, Any],
+    full_name: str,
+    username: Optional[str],
+    student_telegram_id: int
+) -> None:
+    """
+    إضافة طلب تسجيل طالب جديد إلى إشعارات أدمن الشعبة
+    
+    Args:
+        state_data: بيانات حالة التسجيل (section_code, section_id, section_name, admin_telegram_id)
+        full_name: اسم الطالب
+        username: username الطالب
+        student_telegram_id: معرف تلغرام للطالب
+    """
+    try:
+        section_id = state_data.get('section_id')
+        admin_telegram_id = state_data.get('admin_telegram_id')
         
+        # حالات قديمة لا تحتوي على بيانات الأدمن
+        if not section_id or not admin_telegram_id:
+            section = SectionDatabase.get_section_by_code(state_data['section_code'])
+            if not section or not section['admin_telegram_id']:
+                return
+            section_id = section['section_id']
+            admin_telegram_id = section['admin_telegram_id']
+        
+        admin_notifier.add(admin_telegram_id, {
+            'full_name': full_name,
+            'username': username,
+            'telegram_id': student_telegram_id,
+            'section_id': section_id,
+            'section_name': state_data.get('section_name')
+        })
+    
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة رابط التسجيل: {e}")
-        bot.send_message(
-            message.chat.id,
-            Config.Messages.ERROR_GENERAL
-        )
+        logger.error("❌ خطأ في إرسال إشعار للأدمن: %s", e)
 
 
 @bot.message_handler(state=BotStates.waiting_for_name)
@@ -454,9 +1151,8 @@ def handle_student_name(message: types.Message):
             return
         
         # الحصول على كود الشعبة من الحالة
-        with bot.retrieve_data(message.from_user.id, message.chat.id) as data:
-            section_code = data.get('section_code')
-            section_name = data.get('section_name')
+        data = get_state_data(message.from_user.id, message.chat.id)
+        section_code = data.get('section_code')
         
         if not section_code:
             bot.send_message(
@@ -475,45 +1171,16 @@ def handle_student_name(message: types.Message):
         )
         
         if success:
+            # إشعار الأدمن في الخلفية بالتوازي مع رد الطالب
+            notification_executor.submit(
+                notify_admin_of_registration,
+                dict(data), full_name, user_info['username'], user_info['telegram_id']
+            )
+            
             bot.send_message(
                 message.chat.id,
                 Config.Messages.SUCCESS_REGISTRATION_SENT
             )
-            
-            # إرسال إشعار للأدمن
-            section = SectionDatabase.get_section_by_code(section_code)
-            if section:
-                admin = UserDatabase.get_user_by_id(section['admin_id'])
-                if admin:
-                    # تنسيق رسالة طلب التسجيل
-                    request_message = MessageFormatter.format_registration_request_message(
-                        full_name=full_name,
-                        username=user_info['username'],
-                        telegram_id=user_info['telegram_id'],
-                        section_name=section_name
-                    )
-                    
-                    # إنشاء أزرار الموافقة/الرفض
-                    markup = types.InlineKeyboardMarkup()
-                    markup.row(
-                        types.InlineKeyboardButton(
-                            "✅ موافقة",
-                            callback_data=f"approve_{user_info['telegram_id']}_{section['section_id']}"
-                        ),
-                        types.InlineKeyboardButton(
-                            "❌ رفض",
-                            callback_data=f"reject_{user_info['telegram_id']}_{section['section_id']}"
-                        )
-                    )
-                    
-                    try:
-                        bot.send_message(
-                            admin['telegram_id'],
-                            request_message,
-                            reply_markup=markup
-                        )
-                    except Exception as e:
-                        logger.error(f"❌ خطأ في إرسال إشعار للأدمن: {e}")
         else:
             bot.send_message(
                 message.chat.id,
@@ -523,7 +1190,7 @@ def handle_student_name(message: types.Message):
         bot.delete_state(message.from_user.id, message.chat.id)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة اسم الطالب: {e}")
+        logger.error("❌ خطأ في معالجة اسم الطالب: %s", e)
         bot.send_message(
             message.chat.id,
             Config.Messages.ERROR_GENERAL
@@ -533,15 +1200,99 @@ def handle_student_name(message: types.Message):
 
 # ==================== معالجات أزرار الموافقة/الرفض ====================
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('approve_') or call.data.startswith('reject_'))
-def handle_approval_decision(call: types.CallbackQuery):
-    """معالج أزرار الموافقة والرفض"""
+# بيانات أزرار الموافقة/الرفض: a:<طالب>:<شعبة> أو approve_<طالب>_<شعبة>
+_APPROVAL_IDS_RE = re.compile(r'(\d+)[:_](\d+)', re.ASCII)
+
+# نصوص إشعارات الطالب ولاحقات رسالة الطلب
+_APPROVED_STUDENT_MSG = (
+    "🎉 مبروك! تمت الموافقة على تسجيلك في %s\n\n"
+    "يمكنك الآن استلام الواجبات والإشعارات."
+)
+_REJECTED_STUDENT_MSG = (
+    "😔 عذراً، تم رفض طلب تسجيلك.\n\n"
+    "للاستفسار، تواصل مع أدمن الشعبة."
+)
+_APPROVED_SUFFIX = "\n\n✅ تمت الموافقة على الطالب"
+_REJECTED_SUFFIX = "\n\n❌ تم رفض الطالب"
+
+
+def update_request_message(
+    call: types.CallbackQuery,
+    student_telegram_id: int,
+    section_id: int,
+    suffix: str
+) -> None:
+    """
+    تحديث رسالة الطلب بعد الموافقة/الرفض
+    
+    في الرسائل المجمّعة يُحذف صف الطالب فقط وتبقى أزرار بقية الطلاب.
+    
+    Args:
+        call: الضغطة على الزر
+        student_telegram_id: معرف تلغرام للطالب
+        section_id: معرف الشعبة
+        suffix: السطر المضاف إلى نص الرسالة
+    """
+    remaining, student_label = remove_decided_request_row(
+        call.message.reply_markup, student_telegram_id, section_id
+    )
+    
+    if student_label:
+        suffix = f"{suffix}: {student_label}"
+    
+    bot.edit_message_text(
+        chat_id=call.message.chat.id,
+        message_id=call.message.message_id,
+        text=call.message.text + suffix,
+        reply_markup=remaining
+    )
+
+
+def notify_student_of_decision(student_telegram_id: int, section_id: int, approved: bool) -> None:
+    """
+    إرسال نتيجة طلب التسجيل للطالب (تُنفّذ في الخلفية)
+    
+    Args:
+        student_telegram_id: معرف تلغرام للطالب
+        section_id: معرف الشعبة
+        approved: True عند الموافقة و False عند الرفض
+    """
+    try:
+        if approved:
+            # الشعبة من الذاكرة المؤقتة عند الموافقات المتتالية
+            section = SectionDatabase.get_section_by_id(section_id)
+            text = _APPROVED_STUDENT_MSG % section['section_name']
+        else:
+            text = _REJECTED_STUDENT_MSG
+        
+        send_message_with_retry(student_telegram_id, text)
+    except Exception as e:
+        logger.error("❌ خطأ في إرسال نتيجة الطلب للطالب %s: %s", student_telegram_id, e)
+
+
+@callback_prefix_route('a')
+@callback_prefix_route('r')
+@callback_prefix_route('approve')
+@callback_prefix_route('reject')
+def handle_approval_decision(call: types.CallbackQuery, prefix: str, rest: str):
+    """
+    معالج أزرار الموافقة والرفض
+    
+    Args:
+        call: الاستعلام
+        prefix: a/approve للموافقة أو r/reject للرفض
+        rest: <طالب>:<شعبة> أو الصيغة القديمة <طالب>_<شعبة>
+    """
     try:
-        # تحليل البيانات
-        parts = call.data.split('_')
-        action = parts[0]  # approve أو reject
-        student_telegram_id = int(parts[1])
-        section_id = int(parts[2])
+        match = _APPROVAL_IDS_RE.fullmatch(rest)
+        if not match:
+            logger.warning("⚠️ بيانات موافقة غير صالحة: %s", call.data)
+            bot.answer_callback_query(call.id, Config.Messages.ERROR_GENERAL, show_alert=True)
+            return
+        
+        action = 'approve' if prefix in ('a', 'approve') else 'reject'
+        student_telegram_id = int(match.group(1))
+        section_id = int(match.group(2))
         
         admin_telegram_id = call.from_user.id
         
@@ -554,25 +1305,13 @@ def handle_approval_decision(call: types.CallbackQuery):
             )
             
             if success:
-                # تحديث الرسالة
-                bot.edit_message_text(
-                    chat_id=call.message.chat.id,
-                    message_id=call.message.message_id,
-                    text=call.message.text + "\n\n✅ تمت الموافقة على الطالب"
-                )
-                
-                # إرسال إشعار للطالب
-                try:
-                    section = SectionDatabase.get_section_by_id(section_id)
-                    bot.send_message(
-                        student_telegram_id,
-                        f"🎉 مبروك! تمت الموافقة على تسجيلك في {section['section_name']}\n\n"
-                        "يمكنك الآن استلام الواجبات والإشعارات."
-                    )
-                except Exception as e:
-                    logger.error(f"❌ خطأ في إرسال إشعار الموافقة للطالب: {e}")
-                
+                # إيقاف مؤشر التحميل عند الأدمن أولاً، ثم إشعار الطالب في الخلفية
+                # بالتوازي مع تحديث رسالة الطلب
                 bot.answer_callback_query(call.id, "✅ تمت الموافقة")
+                notification_executor.submit(
+                    notify_student_of_decision, student_telegram_id, section_id, True
+                )
+                update_request_message(call, student_telegram_id, section_id, _APPROVED_SUFFIX)
             else:
                 bot.answer_callback_query(call.id, f"❌ {msg}", show_alert=True)
         
@@ -584,35 +1323,33 @@ def handle_approval_decision(call: types.CallbackQuery):
             )
             
             if success:
-                # تحديث الرسالة
-                bot.edit_message_text(
-                    chat_id=call.message.chat.id,
-                    message_id=call.message.message_id,
-                    text=call.message.text + "\n\n❌ تم رفض الطالب"
-                )
-                
-                # إرسال إشعار للطالب
-                try:
-                    bot.send_message(
-                        student_telegram_id,
-                        "😔 عذراً، تم رفض طلب تسجيلك.\n\n"
-                        "للاستفسار، تواصل مع أدمن الشعبة."
-                    )
-                except Exception as e:
-                    logger.error(f"❌ خطأ في إرسال إشعار الرفض للطالب: {e}")
-                
                 bot.answer_callback_query(call.id, "✅ تم رفض الطالب")
+                notification_executor.submit(
+                    notify_student_of_decision, student_telegram_id, section_id, False
+                )
+                update_request_message(call, student_telegram_id, section_id, _REJECTED_SUFFIX)
             else:
                 bot.answer_callback_query(call.id, f"❌ {msg}", show_alert=True)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة قرار الموافقة/الرفض: {e}")
+        logger.error("❌ خطأ في معالجة قرار الموافقة/الرفض: %s", e)
         bot.answer_callback_query(call.id, Config.Messages.ERROR_GENERAL, show_alert=True)
 
 
 # ==================== معالجات أزرار المالك ====================
 
-@bot.message_handler(func=lambda message: message.text == '➕ إنشاء شعبة')
+# نصوص ثابتة لمعالج إنشاء الشعبة تُبنى مرة واحدة
+_CREATE_SECTION_START_TEXT = (
+    "📚 **إنشاء شعبة جديدة**\n\n"
+    "الخطوة 1️⃣: اختر المرحلة الدراسية:"
+)
+_CREATE_SECTION_CANCELLED_TEXT = "❌ **تم إلغاء عملية إنشاء الشعبة**"
+
+# رد الأزرار التي لم تُنفّذ بعد
+_UNDER_DEVELOPMENT_TEXT = "⚠️ هذه الميزة قيد التطوير"
+
+
+@text_route('➕ إنشاء شعبة')
 def handle_create_section_button(message: types.Message):
     """معالج زر إنشاء شعبة"""
     try:
@@ -632,19 +1369,12 @@ def handle_create_section_button(message: types.Message):
             bot.send_message(message.chat.id, "❌ لا توجد مراحل دراسية")
             return
         
-        # إنشاء أزرار المراحل Inline
-        markup = types.InlineKeyboardMarkup(row_width=1)
-        for level in levels:
-            markup.add(types.InlineKeyboardButton(
-                level['level_name'],
-                callback_data=f"create_sec_level_{level['level_id']}"
-            ))
-        markup.add(types.InlineKeyboardButton("❌ إلغاء", callback_data="create_sec_cancel"))
+        # أزرار المراحل Inline
+        markup = create_levels_keyboard(levels)
         
         bot.send_message(
             message.chat.id,
-            "📚 **إنشاء شعبة جديدة**\n\n"
-            "الخطوة 1️⃣: اختر المرحلة الدراسية:",
+            _CREATE_SECTION_START_TEXT,
             reply_markup=markup,
             parse_mode='Markdown'
         )
@@ -655,162 +1385,146 @@ def handle_create_section_button(message: types.Message):
             BotStates.create_section_level,
             message.chat.id
         )
+        bot.reset_data(message.from_user.id, message.chat.id)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر إنشاء شعبة: {e}")
+        logger.error("❌ خطأ في معالجة زر إنشاء شعبة: %s", e)
         bot.send_message(message.chat.id, Config.Messages.ERROR_GENERAL)
 
 
 # ==================== معالجات خطوات إنشاء الشعبة (Callback Handlers) ====================
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('create_sec_level_'))
-def handle_section_level_selection(call: types.CallbackQuery):
-    """معالج اختيار المرحلة الدراسية - الخطوة 1"""
-    try:
-        telegram_id = call.from_user.id
-        chat_id = call.message.chat.id
-        
-        # استخراج level_id
-        level_id = int(call.data.split('_')[-1])
-        
-        # الحصول على معلومات المرحلة
-        levels = get_academic_levels()
-        selected_level = None
-        for level in levels:
-            if level['level_id'] == level_id:
-                selected_level = level
-                break
-        
-        if not selected_level:
-            bot.answer_callback_query(call.id, "❌ خطأ في اختيار المرحلة", show_alert=True)
-            return
-        
-        logger.info(f"📝 المستخدم {telegram_id} اختار المرحلة: {selected_level['level_name']}")
-        
-        # حفظ البيانات
-        with bot.retrieve_data(telegram_id, chat_id) as data:
-            data['level_id'] = level_id
-            data['level_name'] = selected_level['level_name']
-        
-        # إنشاء أزرار نوع الدراسة Inline
-        markup = types.InlineKeyboardMarkup(row_width=2)
-        markup.row(
-            types.InlineKeyboardButton("🌅 صباحي", callback_data="create_sec_type_صباحي"),
-            types.InlineKeyboardButton("🌙 مسائي", callback_data="create_sec_type_مسائي")
-        )
-        markup.add(types.InlineKeyboardButton("❌ إلغاء", callback_data="create_sec_cancel"))
-        
-        # تعديل الرسالة
-        bot.edit_message_text(
-            chat_id=chat_id,
-            message_id=call.message.message_id,
-            text=f"📚 **إنشاء شعبة جديدة**\n\n"
-                 f"✅ المرحلة: {selected_level['level_name']}\n\n"
-                 f"الخطوة 2️⃣: اختر نوع الدراسة:",
-            reply_markup=markup,
-            parse_mode='Markdown'
-        )
-        
-        bot.answer_callback_query(call.id, f"✅ تم اختيار {selected_level['level_name']}")
-        bot.set_state(telegram_id, BotStates.create_section_type, chat_id)
-        
-    except Exception as e:
-        logger.error(f"❌ خطأ في معالجة اختيار المرحلة: {e}")
-        bot.answer_callback_query(call.id, "❌ حدث خطأ", show_alert=True)
+def _resolve_section_level(value: str) -> Optional[tuple]:
+    """تحويل قيمة زر المرحلة إلى (البيانات المحفوظة، الاسم المعروض)"""
+    if not value.isdigit():
+        return None
+    
+    level = get_academic_level(int(value))
+    if not level:
+        return None
+    
+    return {'level_id': level['level_id'], 'level_name': level['level_name']}, level['level_name']
 
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('create_sec_type_'))
-def handle_section_type_selection(call: types.CallbackQuery):
-    """معالج اختيار نوع الدراسة - الخطوة 2"""
-    try:
-        telegram_id = call.from_user.id
-        chat_id = call.message.chat.id
-        
-        # استخراج نوع الدراسة
-        study_type = call.data.split('_')[-1]
-        
-        if study_type not in Config.STUDY_TYPES:
-            bot.answer_callback_query(call.id, "❌ خطأ في اختيار نوع الدراسة", show_alert=True)
-            return
-        
-        logger.info(f"📝 المستخدم {telegram_id} اختار نوع الدراسة: {study_type}")
-        
-        # حفظ البيانات
-        with bot.retrieve_data(telegram_id, chat_id) as data:
-            data['study_type'] = study_type
-            level_name = data.get('level_name')
-        
-        # إنشاء أزرار الشعبة Inline
-        markup = types.InlineKeyboardMarkup(row_width=2)
-        markup.row(
-            types.InlineKeyboardButton("🅰️ شعبة A", callback_data="create_sec_div_A"),
-            types.InlineKeyboardButton("🅱️ شعبة B", callback_data="create_sec_div_B")
-        )
-        markup.add(types.InlineKeyboardButton("❌ إلغاء", callback_data="create_sec_cancel"))
-        
-        # تعديل الرسالة
-        bot.edit_message_text(
-            chat_id=chat_id,
-            message_id=call.message.message_id,
-            text=f"📚 **إنشاء شعبة جديدة**\n\n"
-                 f"✅ المرحلة: {level_name}\n"
-                 f"✅ نوع الدراسة: {study_type}\n\n"
-                 f"الخطوة 3️⃣: اختر الشعبة:",
-            reply_markup=markup,
-            parse_mode='Markdown'
-        )
-        
-        bot.answer_callback_query(call.id, f"✅ تم اختيار {study_type}")
-        bot.set_state(telegram_id, BotStates.create_section_division, chat_id)
-        
-    except Exception as e:
-        logger.error(f"❌ خطأ في معالجة اختيار نوع الدراسة: {e}")
-        bot.answer_callback_query(call.id, "❌ حدث خطأ", show_alert=True)
+def _resolve_study_type(value: str) -> Optional[tuple]:
+    """تحويل قيمة زر نوع الدراسة إلى (البيانات المحفوظة، الاسم المعروض)"""
+    if value not in Config.STUDY_TYPES:
+        return None
+    
+    return {'study_type': value}, value
+
+
+def _resolve_division(value: str) -> Optional[tuple]:
+    """تحويل قيمة زر الشعبة إلى (البيانات المحفوظة، الاسم المعروض)"""
+    if value not in Config.DIVISIONS:
+        return None
+    
+    return {'division': value}, f"شعبة {value}"
+
+
+# أزرار الخطوتين 2 و3 ثابتة فتُبنى مرة واحدة
+_STUDY_TYPE_MARKUP = types.InlineKeyboardMarkup(row_width=2)
+_STUDY_TYPE_MARKUP.row(
+    types.InlineKeyboardButton("🌅 صباحي", callback_data="create_sec_type_صباحي"),
+    types.InlineKeyboardButton("🌙 مسائي", callback_data="create_sec_type_مسائي")
+)
+_STUDY_TYPE_MARKUP.add(types.InlineKeyboardButton("❌ إلغاء", callback_data="create_sec_cancel"))
 
+_DIVISION_MARKUP = types.InlineKeyboardMarkup(row_width=2)
+_DIVISION_MARKUP.row(
+    types.InlineKeyboardButton("🅰️ شعبة A", callback_data="create_sec_div_A"),
+    types.InlineKeyboardButton("🅱️ شعبة B", callback_data="create_sec_div_B")
+)
+_DIVISION_MARKUP.add(types.InlineKeyboardButton("❌ إلغاء", callback_data="create_sec_cancel"))
+
+# خطوات اختيار الشعبة: البادئة -> (اسم الخطوة، دالة التحقق، رسالة الخطأ، الحالة التالية، الأزرار، نص الخطوة التالية)
+_CREATE_SECTION_STEPS: Dict[str, tuple] = {
+    'create_sec_level': (
+        'المرحلة', _resolve_section_level, "❌ خطأ في اختيار المرحلة",
+        BotStates.create_section_type, _STUDY_TYPE_MARKUP,
+        "الخطوة 2️⃣: اختر نوع الدراسة:"
+    ),
+    'create_sec_type': (
+        'نوع الدراسة', _resolve_study_type, "❌ خطأ في اختيار نوع الدراسة",
+        BotStates.create_section_division, _DIVISION_MARKUP,
+        "الخطوة 3️⃣: اختر الشعبة:"
+    ),
+    'create_sec_div': (
+        'الشعبة', _resolve_division, "❌ خطأ في اختيار الشعبة",
+        BotStates.create_section_admin, None,
+        "الخطوة 4️⃣: أدخل معرف تلغرام للأدمن\n\n"
+        "💡 للحصول على المعرف:\n"
+        "• أرسل /myid في هذا البوت\n"
+        "• أو أرسل /start لـ @userinfobot\n\n"
+        "📝 أرسل المعرف الآن:"
+    )
+}
+
+# الحقول المختارة بالترتيب كما تظهر في ملخص الرسالة
+_CREATE_SECTION_SUMMARY = (
+    ('level_name', 'المرحلة'),
+    ('study_type', 'نوع الدراسة'),
+    ('division', 'الشعبة')
+)
 
-@bot.callback_query_handler(func=lambda call: call.data.startswith('create_sec_div_'))
-def handle_section_division_selection(call: types.CallbackQuery):
-    """معالج اختيار الشعبة (A/B) - الخطوة 3"""
+
+@callback_prefix_route('create_sec_level')
+@callback_prefix_route('create_sec_type')
+@callback_prefix_route('create_sec_div')
+def handle_create_section_step(call: types.CallbackQuery, prefix: str, value: str):
+    """
+    معالج خطوات اختيار المرحلة ونوع الدراسة والشعبة (الخطوات 1-3)
+    
+    Args:
+        call: الاستعلام
+        prefix: بادئة الخطوة (create_sec_level/type/div)
+        value: القيمة المختارة بعد البادئة
+    """
     try:
         telegram_id = call.from_user.id
         chat_id = call.message.chat.id
         
-        # استخراج الشعبة
-        division = call.data.split('_')[-1]
+        step_name, resolve, error_text, next_state, markup, prompt = _CREATE_SECTION_STEPS[prefix]
+        
+        resolved = resolve(value)
         
-        if division not in Config.DIVISIONS:
-            bot.answer_callback_query(call.id, "❌ خطأ في اختيار الشعبة", show_alert=True)
+        if not resolved:
+            bot.answer_callback_query(call.id, error_text, show_alert=True)
             return
         
-        logger.info(f"📝 المستخدم {telegram_id} اختار الشعبة: {division}")
+        fields, label = resolved
         
-        # حفظ البيانات
+        logger.debug("📝 المستخدم %s اختار %s: %s", telegram_id, step_name, label)
+        
+        # حفظ الاختيار وقراءة الاختيارات السابقة في عملية واحدة
         with bot.retrieve_data(telegram_id, chat_id) as data:
-            data['division'] = division
-            level_name = data.get('level_name')
-            study_type = data.get('study_type')
+            data.update(fields)
+            summary = "".join(
+                f"✅ {title}: {data[key]}\n"
+                for key, title in _CREATE_SECTION_SUMMARY
+                if key in data
+            )
+            text = f"📚 **إنشاء شعبة جديدة**\n\n{summary}\n{prompt}"
+            
+            # الضغط المكرر على نفس الزر لا يغيّر الرسالة فلا داعي لإعادة إرسالها
+            text_changed = data.get('wizard_text') != text
+            data['wizard_text'] = text
         
-        # تعديل الرسالة لطلب معرف الأدمن
-        bot.edit_message_text(
-            chat_id=chat_id,
-            message_id=call.message.message_id,
-            text=f"📚 **إنشاء شعبة جديدة**\n\n"
-                 f"✅ المرحلة: {level_name}\n"
-                 f"✅ نوع الدراسة: {study_type}\n"
-                 f"✅ الشعبة: {division}\n\n"
-                 f"الخطوة 4️⃣: أدخل معرف تلغرام للأدمن\n\n"
-                 f"💡 للحصول على المعرف:\n"
-                 f"• أرسل /myid في هذا البوت\n"
-                 f"• أو أرسل /start لـ @userinfobot\n\n"
-                 f"📝 أرسل المعرف الآن:",
-            parse_mode='Markdown'
-        )
+        # تعديل الرسالة
+        if text_changed:
+            bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=call.message.message_id,
+                text=text,
+                reply_markup=markup,
+                parse_mode='Markdown'
+            )
         
-        bot.answer_callback_query(call.id, f"✅ تم اختيار شعبة {division}")
-        bot.set_state(telegram_id, BotStates.create_section_admin, chat_id)
+        bot.answer_callback_query(call.id, f"✅ تم اختيار {label}")
+        bot.set_state(telegram_id, next_state, chat_id)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة اختيار الشعبة: {e}")
+        logger.error("❌ خطأ في معالجة خطوة إنشاء الشعبة: %s", e)
         bot.answer_callback_query(call.id, "❌ حدث خطأ", show_alert=True)
 
 
@@ -822,7 +1536,7 @@ def handle_section_admin_input(message: types.Message):
         chat_id = message.chat.id
         admin_input = message.text.strip()
         
-        logger.info(f"📝 المستخدم {telegram_id} أدخل معرف الأدمن: {admin_input}")
+        logger.debug("📝 المستخدم %s أدخل معرف الأدمن: %s", telegram_id, admin_input)
         
         # معالجة الإلغاء
         if admin_input == '❌ إلغاء':
@@ -834,11 +1548,16 @@ def handle_section_admin_input(message: types.Message):
                 "❌ تم إلغاء عملية إنشاء الشعبة",
                 reply_markup=keyboard
             )
-            logger.info(f"🚫 المستخدم {telegram_id} ألغى عملية إنشاء الشعبة")
+            logger.debug("🚫 المستخدم %s ألغى عملية إنشاء الشعبة", telegram_id)
             return
         
-        # التحقق من أن المدخل رقم صحيح
-        if not admin_input.isdigit():
+        # التحقق من أن المدخل رقم صحيح (تحويل واحد بدلاً من isdigit ثم int)
+        try:
+            admin_telegram_id = int(admin_input)
+        except ValueError:
+            admin_telegram_id = None
+        
+        if admin_telegram_id is None or not Validator.validate_telegram_id(admin_telegram_id):
             bot.send_message(
                 chat_id,
                 "❌ معرف تلغرام يجب أن يكون رقماً صحيحاً\n\n"
@@ -846,17 +1565,6 @@ def handle_section_admin_input(message: types.Message):
             )
             return
         
-        admin_telegram_id = int(admin_input)
-        
-        # التحقق من أن المعرف صحيح
-        is_valid, error = Validator.validate_telegram_id(admin_telegram_id)
-        if not is_valid:
-            bot.send_message(
-                chat_id,
-                f"❌ {error}\n\nالرجاء إدخال معرف تلغرام صحيح:"
-            )
-            return
-        
         # التحقق من أن المعرف ليس معرف المالك نفسه
         if admin_telegram_id == telegram_id:
             bot.send_message(
@@ -872,10 +1580,10 @@ def handle_section_admin_input(message: types.Message):
         admin_name = "أدمن جديد"
         if admin_user:
             admin_name = admin_user['full_name']
-            logger.info(f"✅ الأدمن موجود في قاعدة البيانات: {admin_name}")
+            logger.debug("✅ الأدمن موجود في قاعدة البيانات: %s", admin_name)
         else:
             # إنشاء حساب للأدمن تلقائياً
-            success, msg = UserDatabase.create_user(
+            success, msg, _ = UserDatabase.create_user(
                 telegram_id=admin_telegram_id,
                 full_name=f"Admin_{admin_telegram_id}",
                 user_type='admin'
@@ -883,7 +1591,7 @@ def handle_section_admin_input(message: types.Message):
             
             if success:
                 admin_name = f"Admin_{admin_telegram_id}"
-                logger.info(f"✅ تم إنشاء حساب أدمن جديد: {admin_name}")
+                logger.info("✅ تم إنشاء حساب أدمن جديد: %s", admin_name)
             else:
                 bot.send_message(
                     chat_id,
@@ -892,19 +1600,16 @@ def handle_section_admin_input(message: types.Message):
                 )
                 return
         
-        # حفظ معرف الأدمن
+        # حفظ معرف الأدمن وجلب بقية البيانات لعرض الملخص في عملية واحدة
         with bot.retrieve_data(message.from_user.id, chat_id) as data:
             data['admin_telegram_id'] = admin_telegram_id
             data['admin_name'] = admin_name
-        
-        logger.info(f"✅ تم حفظ معرف الأدمن: {admin_telegram_id}")
-        
-        # جلب جميع البيانات لعرض الملخص
-        with bot.retrieve_data(message.from_user.id, chat_id) as data:
             level_name = data.get('level_name')
             study_type = data.get('study_type')
             division = data.get('division')
         
+        logger.debug("✅ تم حفظ معرف الأدمن: %s", admin_telegram_id)
+        
         # عرض ملخص الشعبة
         summary = f"""
 📋 ملخص الشعبة الجديدة:
@@ -916,7 +1621,8 @@ def handle_section_admin_input(message: types.Message):
 🆔 معرف الأدمن: {admin_telegram_id}
 
 ⚠️ تأكد من صحة البيانات قبل الإنشاء
-"""
+
+اضغط على أحد الأزرار:"""
         
         # إنشاء أزرار التأكيد
         markup = types.InlineKeyboardMarkup()
@@ -931,45 +1637,34 @@ def handle_section_admin_input(message: types.Message):
             )
         )
         
-        # إزالة أزرار الرد
-        remove_keyboard = types.ReplyKeyboardRemove()
-        
-        bot.send_message(
-            chat_id,
-            summary,
-            reply_markup=remove_keyboard
-        )
-        
-        bot.send_message(
-            chat_id,
-            "اضغط على أحد الأزرار:",
-            reply_markup=markup
-        )
+        # الملخص وأزرار التأكيد في رسالة واحدة (أزرار Inline لا تستبدل لوحة الرد
+        # فلا حاجة لرسالة منفصلة لإزالتها)
+        bot.send_message(chat_id, summary, reply_markup=markup)
         
-        logger.info(f"📋 تم عرض ملخص الشعبة للمستخدم {telegram_id}")
+        logger.debug("📋 تم عرض ملخص الشعبة للمستخدم %s", telegram_id)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة إدخال معرف الأدمن: {e}")
+        logger.error("❌ خطأ في معالجة إدخال معرف الأدمن: %s", e)
         bot.send_message(message.chat.id, Config.Messages.ERROR_GENERAL)
         bot.delete_state(message.from_user.id, message.chat.id)
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'confirm_create_section')
+@callback_route('confirm_create_section')
 def handle_confirm_create_section(call: types.CallbackQuery):
     """معالج تأكيد إنشاء الشعبة - الخطوة 5"""
     try:
         telegram_id = call.from_user.id
         chat_id = call.message.chat.id
         
-        logger.info(f"✅ المستخدم {telegram_id} أكد إنشاء الشعبة")
+        logger.debug("✅ المستخدم %s أكد إنشاء الشعبة", telegram_id)
         
         # جلب البيانات المحفوظة
-        with bot.retrieve_data(telegram_id, chat_id) as data:
-            level_id = data.get('level_id')
-            study_type = data.get('study_type')
-            division = data.get('division')
-            admin_telegram_id = data.get('admin_telegram_id')
-            level_name = data.get('level_name')
+        data = get_state_data(telegram_id, chat_id)
+        level_id = data.get('level_id')
+        study_type = data.get('study_type')
+        division = data.get('division')
+        admin_telegram_id = data.get('admin_telegram_id')
+        level_name = data.get('level_name')
         
         # التحقق من وجود جميع البيانات
         if not all([level_id, study_type, division, admin_telegram_id]):
@@ -997,8 +1692,12 @@ def handle_confirm_create_section(call: types.CallbackQuery):
             owner_id=telegram_id
         )
         
+        # لوحة المفاتيح الرئيسية تُعاد في الحالتين فيُجلب نوع المستخدم مرة واحدة
+        user_status = UserDatabase.get_user_status(telegram_id)
+        keyboard = create_main_keyboard(user_status[0] if user_status else '')
+        
         if success:
-            logger.info(f"✅ تم إنشاء الشعبة بنجاح: {section_info.get('section_name')}")
+            logger.info("✅ تم إنشاء الشعبة بنجاح: %s", section_info.get('section_name'))
             
             # رسالة النجاح
             success_message = f"""
@@ -1035,13 +1734,11 @@ def handle_confirm_create_section(call: types.CallbackQuery):
 🚀 ابدأ بإرسال /start للبوت
 """
                 bot.send_message(admin_telegram_id, admin_notification)
-                logger.info(f"✅ تم إرسال إشعار للأدمن: {admin_telegram_id}")
+                logger.info("✅ تم إرسال إشعار للأدمن: %s", admin_telegram_id)
             except Exception as e:
-                logger.error(f"❌ خطأ في إرسال إشعار للأدمن: {e}")
+                logger.error("❌ خطأ في إرسال إشعار للأدمن: %s", e)
             
             # إعادة لوحة المفاتيح الرئيسية
-            user = UserDatabase.get_user(telegram_id)
-            keyboard = create_main_keyboard(user['user_type'])
             bot.send_message(
                 chat_id,
                 "يمكنك الآن إدارة الشعب:",
@@ -1051,7 +1748,7 @@ def handle_confirm_create_section(call: types.CallbackQuery):
             bot.answer_callback_query(call.id, "✅ تم إنشاء الشعبة بنجاح!")
             
         else:
-            logger.error(f"❌ فشل إنشاء الشعبة: {message_text}")
+            logger.error("❌ فشل إنشاء الشعبة: %s", message_text)
             
             bot.edit_message_text(
                 chat_id=chat_id,
@@ -1060,8 +1757,6 @@ def handle_confirm_create_section(call: types.CallbackQuery):
             )
             
             # إعادة لوحة المفاتيح الرئيسية
-            user = UserDatabase.get_user(telegram_id)
-            keyboard = create_main_keyboard(user['user_type'])
             bot.send_message(
                 chat_id,
                 "يمكنك المحاولة مرة أخرى:",
@@ -1076,10 +1771,10 @@ def handle_confirm_create_section(call: types.CallbackQuery):
         
         # حذف الـ state
         bot.delete_state(telegram_id, chat_id)
-        logger.info(f"🔄 تم حذف الـ state للمستخدم {telegram_id}")
+        logger.debug("🔄 تم حذف الـ state للمستخدم %s", telegram_id)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في تأكيد إنشاء الشعبة: {e}")
+        logger.error("❌ خطأ في تأكيد إنشاء الشعبة: %s", e)
         bot.answer_callback_query(
             call.id,
             Config.Messages.ERROR_GENERAL,
@@ -1088,14 +1783,15 @@ def handle_confirm_create_section(call: types.CallbackQuery):
         bot.delete_state(call.from_user.id, call.message.chat.id)
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'create_sec_cancel')
+@callback_route('create_sec_cancel')
+@callback_route('cancel_create_section')
 def handle_cancel_create_section(call: types.CallbackQuery):
     """معالج إلغاء إنشاء الشعبة من الـ callback"""
     try:
         telegram_id = call.from_user.id
         chat_id = call.message.chat.id
         
-        logger.info(f"🚫 المستخدم {telegram_id} ألغى إنشاء الشعبة")
+        logger.debug("🚫 المستخدم %s ألغى إنشاء الشعبة", telegram_id)
         
         # حذف الـ state
         bot.delete_state(telegram_id, chat_id)
@@ -1104,14 +1800,14 @@ def handle_cancel_create_section(call: types.CallbackQuery):
         bot.edit_message_text(
             chat_id=chat_id,
             message_id=call.message.message_id,
-            text="❌ **تم إلغاء عملية إنشاء الشعبة**",
+            text=_CREATE_SECTION_CANCELLED_TEXT,
             parse_mode='Markdown'
         )
         
         bot.answer_callback_query(call.id, "✅ تم الإلغاء")
         
     except Exception as e:
-        logger.error(f"❌ خطأ في إلغاء إنشاء الشعبة: {e}")
+        logger.error("❌ خطأ في إلغاء إنشاء الشعبة: %s", e)
         bot.answer_callback_query(
             call.id,
             Config.Messages.ERROR_GENERAL,
@@ -1121,7 +1817,7 @@ def handle_cancel_create_section(call: types.CallbackQuery):
 
 # ==================== معالجات أزرار القائمة الرئيسية ====================
 
-@bot.callback_query_handler(func=lambda call: call.data == 'owner_create_section')
+@callback_route('owner_create_section')
 def handle_owner_create_section_inline(call: types.CallbackQuery):
     """معالج زر إنشاء شعبة من Inline"""
     try:
@@ -1141,19 +1837,12 @@ def handle_owner_create_section_inline(call: types.CallbackQuery):
             bot.answer_callback_query(call.id, "❌ لا توجد مراحل دراسية", show_alert=True)
             return
         
-        # إنشاء أزرار المراحل Inline
-        markup = types.InlineKeyboardMarkup(row_width=1)
-        for level in levels:
-            markup.add(types.InlineKeyboardButton(
-                level['level_name'],
-                callback_data=f"create_sec_level_{level['level_id']}"
-            ))
-        markup.add(types.InlineKeyboardButton("❌ إلغاء", callback_data="create_sec_cancel"))
+        # أزرار المراحل Inline
+        markup = create_levels_keyboard(levels)
         
         bot.send_message(
             call.message.chat.id,
-            "📚 **إنشاء شعبة جديدة**\n\n"
-            "الخطوة 1️⃣: اختر المرحلة الدراسية:",
+            _CREATE_SECTION_START_TEXT,
             reply_markup=markup,
             parse_mode='Markdown'
         )
@@ -1164,15 +1853,16 @@ def handle_owner_create_section_inline(call: types.CallbackQuery):
             BotStates.create_section_level,
             call.message.chat.id
         )
+        bot.reset_data(telegram_id, call.message.chat.id)
         
         bot.answer_callback_query(call.id)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر إنشاء شعبة: {e}")
+        logger.error("❌ خطأ في معالجة زر إنشاء شعبة: %s", e)
         bot.answer_callback_query(call.id, Config.Messages.ERROR_GENERAL, show_alert=True)
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'owner_list_sections')
+@callback_route('owner_list_sections')
 def handle_owner_list_sections_inline(call: types.CallbackQuery):
     """معالج زر عرض الشعب من Inline"""
     try:
@@ -1196,74 +1886,28 @@ def handle_owner_list_sections_inline(call: types.CallbackQuery):
             bot.answer_callback_query(call.id, "لا توجد شعب", show_alert=True)
             return
         
-        message_text = "📋 قائمة الشعب:\n\n"
-        
-        for section in sections:
-            message_text += f"🏷️ {section['section_name']}\n"
-            
-            if 'admin_name' in section and section['admin_name']:
-                message_text += f"👨‍💼 الأدمن: {section['admin_name']}\n"
-            
-            message_text += f"🔗 رابط التسجيل:\n{get_bot_link(section['join_code'])}\n"
-            message_text += "─" * 30 + "\n\n"
-        
-        send_long_message(call.message.chat.id, message_text)
+        send_message_blocks(call.message.chat.id, format_sections_list(sections))
         bot.answer_callback_query(call.id)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر عرض الشعب: {e}")
+        logger.error("❌ خطأ في معالجة زر عرض الشعب: %s", e)
         bot.answer_callback_query(call.id, Config.Messages.ERROR_GENERAL, show_alert=True)
 
 
-@bot.callback_query_handler(func=lambda call: call.data == 'owner_statistics')
-def handle_owner_statistics_inline(call: types.CallbackQuery):
-    """معالج زر الإحصائيات من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
-
-
-@bot.callback_query_handler(func=lambda call: call.data == 'owner_settings')
-def handle_owner_settings_inline(call: types.CallbackQuery):
-    """معالج زر الإعدادات من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
-
-
-@bot.callback_query_handler(func=lambda call: call.data == 'admin_create_assignment')
-def handle_admin_create_assignment_inline(call: types.CallbackQuery):
-    """معالج زر نشر واجب من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
-
-
-@bot.callback_query_handler(func=lambda call: call.data == 'admin_list_assignments')
-def handle_admin_list_assignments_inline(call: types.CallbackQuery):
-    """معالج زر الواجبات من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
-
-
-@bot.callback_query_handler(func=lambda call: call.data == 'admin_manage_students')
-def handle_admin_manage_students_inline(call: types.CallbackQuery):
-    """معالج زر إدارة الطلاب من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
-
+@callback_route('owner_statistics')
+@callback_route('owner_settings')
+@callback_route('admin_create_assignment')
+@callback_route('admin_list_assignments')
+@callback_route('admin_manage_students')
+@callback_route('admin_pending_requests')
+@callback_route('student_my_assignments')
+@callback_route('student_section_info')
+def handle_under_development_inline(call: types.CallbackQuery):
+    """معالج أزرار القائمة التي لم تُنفّذ بعد"""
+    bot.answer_callback_query(call.id, _UNDER_DEVELOPMENT_TEXT, show_alert=True)
 
-@bot.callback_query_handler(func=lambda call: call.data == 'admin_pending_requests')
-def handle_admin_pending_requests_inline(call: types.CallbackQuery):
-    """معالج زر الطلبات المعلقة من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
 
-
-@bot.callback_query_handler(func=lambda call: call.data == 'student_my_assignments')
-def handle_student_my_assignments_inline(call: types.CallbackQuery):
-    """معالج زر واجباتي من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
-
-
-@bot.callback_query_handler(func=lambda call: call.data == 'student_section_info')
-def handle_student_section_info_inline(call: types.CallbackQuery):
-    """معالج زر معلومات الشعبة من Inline"""
-    bot.answer_callback_query(call.id, "⚠️ هذه الميزة قيد التطوير", show_alert=True)
-
-
-@bot.message_handler(func=lambda message: message.text == '📋 عرض الشعب')
+@text_route('📋 عرض الشعب')
 def handle_list_sections_button(message: types.Message):
     """معالج زر عرض الشعب"""
     try:
@@ -1287,25 +1931,14 @@ def handle_list_sections_button(message: types.Message):
             bot.send_message(message.chat.id, "لا توجد شعب")
             return
         
-        message_text = "📋 قائمة الشعب:\n\n"
-        
-        for section in sections:
-            message_text += f"🏷️ {section['section_name']}\n"
-            
-            if 'admin_name' in section and section['admin_name']:
-                message_text += f"👨‍💼 الأدمن: {section['admin_name']}\n"
-            
-            message_text += f"🔗 رابط التسجيل:\n{get_bot_link(section['join_code'])}\n"
-            message_text += "─" * 30 + "\n\n"
-        
-        send_long_message(message.chat.id, message_text)
+        send_message_blocks(message.chat.id, format_sections_list(sections))
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر عرض الشعب: {e}")
+        logger.error("❌ خطأ في معالجة زر عرض الشعب: %s", e)
         bot.send_message(message.chat.id, Config.Messages.ERROR_GENERAL)
 
 
-@bot.message_handler(func=lambda message: message.text == '📊 الإحصائيات')
+@text_route('📊 الإحصائيات')
 def handle_statistics_button(message: types.Message):
     """معالج زر الإحصائيات"""
     try:
@@ -1332,13 +1965,13 @@ def handle_statistics_button(message: types.Message):
         bot.send_message(message.chat.id, stats_message)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر الإحصائيات: {e}")
+        logger.error("❌ خطأ في معالجة زر الإحصائيات: %s", e)
         bot.send_message(message.chat.id, Config.Messages.ERROR_GENERAL)
 
 
 # ==================== معالجات أزرار الأدمن ====================
 
-@bot.message_handler(func=lambda message: message.text == '⏳ الطلبات المعلقة')
+@text_route('⏳ الطلبات المعلقة')
 def handle_pending_requests_button(message: types.Message):
     """معالج زر الطلبات المعلقة"""
     try:
@@ -1351,62 +1984,47 @@ def handle_pending_requests_button(message: types.Message):
             bot.send_message(message.chat.id, f"❌ {error}")
             return
         
-        # الحصول على شعب الأدمن
-        sections = SectionDatabase.get_admin_sections(telegram_id)
+        # جميع الطلبات المعلقة في شعب الأدمن باستعلام واحد
+        pending_students = StudentDatabase.get_pending_students_for_admin(telegram_id)
         
-        if not sections:
-            bot.send_message(message.chat.id, "❌ ليس لديك شعب")
+        if not pending_students:
+            if not SectionDatabase.get_admin_sections(telegram_id):
+                bot.send_message(message.chat.id, "❌ ليس لديك شعب")
+            else:
+                bot.send_message(message.chat.id, "✅ لا توجد طلبات معلقة")
             return
         
-        # الحصول على الطلبات المعلقة
-        total_pending = 0
-        message_text = "⏳ الطلبات المعلقة:\n\n"
+        # طلب واحد برسالته المعتادة، وأكثر من ذلك في رسائل مجمّعة (صف أزرار لكل طالب)
+        # بدلاً من رسالة منفصلة لكل طالب
+        if len(pending_students) == 1:
+            student = pending_students[0]
+            username_part = student['username'] if student['username'] else "بدون username"
+            bot.send_message(
+                message.chat.id,
+                f"👤 {student['full_name']}\n"
+                f"🆔 {username_part}\n"
+                f"📚 {student['section_name']}",
+                reply_markup=create_approval_markup(student['telegram_id'], student['section_id'])
+            )
+            return
         
-        for section in sections:
-            pending_students = StudentDatabase.get_pending_students(section['section_id'])
-            
-            if pending_students:
-                message_text += f"📚 {section['section_name']}\n"
-                total_pending += len(pending_students)
-                
-                for student in pending_students:
-                    username_part = student['username'] if student['username'] else "بدون username"
-                    message_text += f"  • {student['full_name']} ({username_part})\n"
-                    
-                    # إضافة أزرار الموافقة/الرفض
-                    markup = types.InlineKeyboardMarkup()
-                    markup.row(
-                        types.InlineKeyboardButton(
-                            "✅ موافقة",
-                            callback_data=f"approve_{student['telegram_id']}_{section['section_id']}"
-                        ),
-                        types.InlineKeyboardButton(
-                            "❌ رفض",
-                            callback_data=f"reject_{student['telegram_id']}_{section['section_id']}"
-                        )
-                    )
-                    
-                    bot.send_message(
-                        message.chat.id,
-                        f"👤 {student['full_name']}\n"
-                        f"🆔 {username_part}\n"
-                        f"📚 {section['section_name']}",
-                        reply_markup=markup
-                    )
-                
-                message_text += "\n"
-        
-        if total_pending == 0:
-            bot.send_message(message.chat.id, "✅ لا توجد طلبات معلقة")
+        batch_size = Config.ADMIN_NOTIFICATION_MAX_BATCH
+        for start in range(0, len(pending_students), batch_size):
+            batch = pending_students[start:start + batch_size]
+            send_message_with_retry(
+                message.chat.id,
+                MessageFormatter.format_registration_batch_message(batch, "⏳ الطلبات المعلقة"),
+                reply_markup=create_batch_approval_markup(batch)
+            )
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر الطلبات المعلقة: {e}")
+        logger.error("❌ خطأ في معالجة زر الطلبات المعلقة: %s", e)
         bot.send_message(message.chat.id, Config.Messages.ERROR_GENERAL)
 
 
 # ==================== معالجات أزرار الطالب ====================
 
-@bot.message_handler(func=lambda message: message.text == '📚 واجباتي')
+@text_route('📚 واجباتي')
 def handle_my_assignments_button(message: types.Message):
     """معالج زر واجباتي"""
     try:
@@ -1429,25 +2047,27 @@ def handle_my_assignments_button(message: types.Message):
             bot.send_message(message.chat.id, "✅ لا توجد واجبات حالياً")
             return
         
-        message_text = "📚 واجباتك:\n\n"
+        blocks = ["📚 واجباتك:\n\n"]
         
         for assignment in assignments:
-            deadline = datetime.fromisoformat(assignment['deadline'])
+            deadline = DateTimeHelper.from_timestamp(assignment['deadline'])
             
-            message_text += f"📖 {assignment['subject_name']}\n"
-            message_text += f"📌 {assignment['title']}\n"
-            message_text += f"⏰ {DateTimeHelper.format_datetime(deadline)}\n"
-            message_text += f"⏳ {DateTimeHelper.get_remaining_time(deadline)}\n"
-            message_text += "─" * 30 + "\n\n"
+            blocks.append(
+                f"📖 {assignment['subject_name']}\n"
+                f"📌 {assignment['title']}\n"
+                f"⏰ {DateTimeHelper.format_datetime(deadline)}\n"
+                f"⏳ {DateTimeHelper.get_remaining_time(deadline)}\n"
+                f"{_SEP}"
+            )
         
-        send_long_message(message.chat.id, message_text)
+        send_message_blocks(message.chat.id, blocks)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر واجباتي: {e}")
+        logger.error("❌ خطأ في معالجة زر واجباتي: %s", e)
         bot.send_message(message.chat.id, Config.Messages.ERROR_GENERAL)
 
 
-@bot.message_handler(func=lambda message: message.text == 'ℹ️ معلومات الشعبة')
+@text_route('ℹ️ معلومات الشعبة')
 def handle_section_info_button(message: types.Message):
     """معالج زر معلومات الشعبة"""
     try:
@@ -1475,12 +2095,51 @@ def handle_section_info_button(message: types.Message):
         bot.send_message(message.chat.id, info_text)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في معالجة زر معلومات الشعبة: {e}")
+        logger.error("❌ خطأ في معالجة زر معلومات الشعبة: %s", e)
         bot.send_message(message.chat.id, Config.Messages.ERROR_GENERAL)
 
 
 # ==================== دالة إرسال الإشعارات ====================
 
+def _send_notification(
+    chat_id: int,
+    text: str,
+    source_message: Optional[types.Message] = None
+) -> str:
+    """
+    إرسال إشعار واحد (يُنفّذ داخل مجمّع خيوط الإشعارات)
+    
+    Args:
+        chat_id: معرف محادثة الطالب
+        text: نص الإشعار
+        source_message: رسالة البث الأصلية لنسخها بدلاً من إرسال النص (اختياري)
+    
+    Returns:
+        حالة التسليم (sent/blocked/failed)
+    """
+    try:
+        if source_message:
+            call_with_flood_retry(
+                bot.copy_message, chat_id,
+                source_message.chat.id, source_message.message_id
+            )
+        else:
+            send_message_with_retry(chat_id, text)
+        return 'sent'
+        
+    except apihelper.ApiTelegramException as e:
+        logger.error("❌ خطأ في إرسال إشعار للطالب %s: %s", chat_id, e)
+        
+        # 403: الطالب حظر البوت أو حذف حسابه
+        if e.error_code == 403:
+            return 'blocked'
+        return 'failed'
+        
+    except Exception as e:
+        logger.error("❌ خطأ في إرسال إشعار للطالب %s: %s", chat_id, e)
+        return 'failed'
+
+
 def send_assignment_notifications(
     assignment_id: int,
     section_id: int,
@@ -1498,22 +2157,19 @@ def send_assignment_notifications(
         قاموس يحتوي على إحصائيات الإرسال
     """
     try:
-        # الحصول على معلومات الواجب
-        assignment = AssignmentDatabase.get_assignment_by_id(assignment_id)
+        # الواجب ومعرفات الطلاب الموافق عليهم في شعبته باستعلام واحد
+        assignment, student_ids = AssignmentDatabase.get_assignment_with_recipients(assignment_id)
         
         if not assignment:
-            logger.error(f"❌ الواجب {assignment_id} غير موجود")
+            logger.error("❌ الواجب %s غير موجود", assignment_id)
             return {'sent': 0, 'failed': 0, 'blocked': 0}
         
-        # الحصول على الطلاب الموافق عليهم
-        students = StudentDatabase.get_approved_students(section_id)
-        
-        if not students:
-            logger.info(f"ℹ️ لا يوجد طلاب في الشعبة {section_id}")
+        if not student_ids:
+            logger.info("ℹ️ لا يوجد طلاب في الشعبة %s", section_id)
             return {'sent': 0, 'failed': 0, 'blocked': 0}
         
         # تنسيق رسالة الواجب
-        deadline = datetime.fromisoformat(assignment['deadline'])
+        deadline = DateTimeHelper.from_timestamp(assignment['deadline'])
         
         if notification_type == 'new':
             message_text = MessageFormatter.format_assignment_message(
@@ -1534,52 +2190,70 @@ def send_assignment_notifications(
                 deadline
             )
         
-        # إرسال الإشعارات
-        stats = {'sent': 0, 'failed': 0, 'blocked': 0}
-        
-        for student in students:
+        # نشر الرسالة مرة واحدة في محادثة المصدر (إن وُجدت) ثم نسخها للطلاب
+        source_message = None
+        if Config.NOTIFICATION_SOURCE_CHAT_ID:
             try:
-                bot.send_message(student['telegram_id'], message_text)
-                
-                # تسجيل الإشعار
-                NotificationDatabase.log_notification(
-                    assignment_id=assignment_id,
-                    student_telegram_id=student['telegram_id'],
-                    notification_type=notification_type,
-                    delivery_status='sent'
+                source_message = send_message_with_retry(
+                    Config.NOTIFICATION_SOURCE_CHAT_ID, message_text
                 )
-                
-                stats['sent'] += 1
-                
-                # تأخير صغير لتجنب الحظر
-                time.sleep(Config.NOTIFICATION_DELAY_SECONDS)
-                
             except Exception as e:
-                logger.error(f"❌ خطأ في إرسال إشعار للطالب {student['telegram_id']}: {e}")
-                
-                if "blocked" in str(e).lower():
-                    delivery_status = 'blocked'
-                    stats['blocked'] += 1
-                else:
-                    delivery_status = 'failed'
-                    stats['failed'] += 1
-                
-                # تسجيل الفشل
-                NotificationDatabase.log_notification(
-                    assignment_id=assignment_id,
-                    student_telegram_id=student['telegram_id'],
-                    notification_type=notification_type,
-                    delivery_status=delivery_status
-                )
+                logger.error("❌ تعذر النشر في محادثة المصدر، سيتم الإرسال المباشر: %s", e)
+        
+        # إرسال جميع الإشعارات بالتوازي دون انتظار اكتمال كل دفعة:
+        # عدد خيوط المجمّع يحدد الإرسال المتزامن، ومحدد المعدل يضبط الوتيرة
+        stats = {'sent': 0, 'failed': 0, 'blocked': 0}
+        pending_logs = []
+        
+        statuses = notification_executor.map(
+            lambda student_id: _send_notification(student_id, message_text, source_message),
+            student_ids
+        )
+        
+        for student_id, delivery_status in zip(student_ids, statuses):
+            stats[delivery_status] += 1
+            pending_logs.append((
+                assignment_id, student_id,
+                notification_type, delivery_status
+            ))
+        
+        # تسجيل جميع الإشعارات دفعة واحدة
+        NotificationDatabase.log_notifications_bulk(pending_logs)
         
-        logger.info(f"✅ تم إرسال الإشعارات: {stats}")
+        logger.info("✅ تم إرسال الإشعارات: %s", stats)
         return stats
         
     except Exception as e:
-        logger.error(f"❌ خطأ في إرسال الإشعارات: {e}")
+        logger.error("❌ خطأ في إرسال الإشعارات: %s", e)
         return {'sent': 0, 'failed': 0, 'blocked': 0}
 
 
+def schedule_assignment_notifications(
+    assignment_id: int,
+    section_id: int,
+    notification_type: str = 'new'
+) -> Future:
+    """
+    جدولة إرسال إشعارات الواجب في الخلفية والعودة فوراً
+    
+    Args:
+        assignment_id: معرف الواجب
+        section_id: معرف الشعبة
+        notification_type: نوع الإشعار
+    
+    Returns:
+        Future تحمل إحصائيات الإرسال عند الانتهاء
+    """
+    logger.info("📤 جدولة إشعارات الواجب %s للشعبة %s", assignment_id, section_id)
+    
+    return broadcast_executor.submit(
+        send_assignment_notifications,
+        assignment_id,
+        section_id,
+        notification_type
+    )
+
+
 # ==================== دالة بدء البوت ====================
 
 def start_bot():
@@ -1587,16 +2261,31 @@ def start_bot():
     try:
         logger.info("=" * 60)
         logger.info("🤖 بدء تشغيل بوت الواجبات الجامعي")
-        logger.info(f"📝 اسم البوت: {Config.BOT_NAME}")
-        logger.info(f"🆔 Username: @{Config.BOT_USERNAME}")
+        logger.info("📝 اسم البوت: %s", Config.BOT_NAME)
+        logger.info("🆔 Username: @%s", Config.BOT_USERNAME)
         logger.info("=" * 60)
         
         # بدء استقبال الرسائل
-        logger.info("✅ البوت يعمل الآن...")
-        bot.infinity_polling()
+        if Config.USE_WEBHOOK:
+            url_path = f"{Config.WEBHOOK_SECRET or Config.BOT_TOKEN}/"
+            logger.info("✅ البوت يعمل الآن عبر webhook على المنفذ %s...", Config.WEBHOOK_PORT)
+            bot.run_webhooks(
+                listen=Config.WEBHOOK_LISTEN,
+                port=Config.WEBHOOK_PORT,
+                url_path=url_path,
+                webhook_url=f"{Config.WEBHOOK_URL}/{url_path}",
+                max_connections=Config.WEBHOOK_MAX_CONNECTIONS,
+                allowed_updates=Config.ALLOWED_UPDATES,
+                secret_token=Config.WEBHOOK_SECRET or None
+            )
+        else:
+            logger.info("✅ البوت يعمل الآن...")
+            bot.remove_webhook()
+            # استطلاع طويل لأنواع التحديثات المستخدمة فقط
+            bot.infinity_polling(allowed_updates=Config.ALLOWED_UPDATES)
         
     except Exception as e:
-        logger.error(f"❌ خطأ في تشغيل البوت: {e}")
+        logger.error("❌ خطأ في تشغيل البوت: %s", e)
         raise
 
 
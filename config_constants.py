@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+الثوابت الثابتة لبوت التلغرام الجامعي
+الحالات والرسائل والأزرار والأوامر والحدود التي لا تعتمد على متغيرات البيئة،
+فيمكن استيرادها دون قراءة ملف .env
+"""
+
+import sys
+import textwrap
+
+
+class ConfigConstants:
+    """الثوابت التي يرثها كلاس الإعدادات Config"""
+    
+    # ==================== إعدادات Webhook ====================
+    
+    # أنواع التحديثات التي يعالجها البوت
+    ALLOWED_UPDATES = ['message', 'callback_query']
+    
+    # ==================== إعدادات الشعب ====================
+    
+    # أنواع الدراسة المسموحة (frozenset لأنها تُستخدم للتحقق من العضوية فقط)
+    STUDY_TYPES = frozenset(('صباحي', 'مسائي'))
+    
+    # الشعب المسموحة
+    DIVISIONS = frozenset(('A', 'B'))
+    
+    # ==================== إعدادات الواجبات ====================
+    
+    # الحد الأقصى لطول عنوان الواجب
+    MAX_ASSIGNMENT_TITLE_LENGTH = 200
+    
+    # الحد الأقصى لطول وصف الواجب
+    MAX_ASSIGNMENT_DESCRIPTION_LENGTH = 2000
+    
+    # ==================== إعدادات التاريخ والوقت ====================
+    
+    # صيغة عرض التاريخ
+    DATE_FORMAT = '%Y-%m-%d'
+    
+    # صيغة عرض الوقت
+    TIME_FORMAT = '%H:%M'
+    
+    # صيغة عرض التاريخ والوقت معاً
+    DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+    
+    # ==================== إعدادات الرسائل ====================
+    
+    # الحد الأقصى لطول الرسالة في تلغرام
+    MAX_MESSAGE_LENGTH = 4096
+    
+    # الحد الأقصى لطول Caption في تلغرام
+    MAX_CAPTION_LENGTH = 1024
+    
+    # ==================== إعدادات الأمان ====================
+    
+    # طول الكود الفريد للشعبة
+    SECTION_CODE_LENGTH = 12
+    
+    # بادئة كود الشعبة
+    SECTION_CODE_PREFIX = 'SEC_'
+    
+    # عدد المحاولات لتوليد كود فريد
+    MAX_CODE_GENERATION_ATTEMPTS = 10
+    
+    # ==================== إعدادات الأداء ====================
+    
+    # الحد الأقصى لعدد العناصر في كل ذاكرة مؤقتة
+    CACHE_MAX_SIZE = 10000
+    
+    # ==================== حالات المحادثة (States) ====================
+    
+    class States:
+        """حالات المحادثة للبوت"""
+        
+        # حالات عامة
+        MAIN_MENU = 'main_menu'
+        
+        # حالات التسجيل
+        WAITING_FOR_NAME = 'waiting_for_name'
+        REGISTRATION_PENDING = 'registration_pending'
+        
+        # حالات إنشاء الشعبة
+        CREATE_SECTION_LEVEL = 'create_section_level'
+        CREATE_SECTION_TYPE = 'create_section_type'
+        CREATE_SECTION_DIVISION = 'create_section_division'
+        CREATE_SECTION_ADMIN = 'create_section_admin'
+        
+        # حالات إنشاء الواجب
+        CREATE_ASSIGNMENT_SUBJECT = 'create_assignment_subject'
+        CREATE_ASSIGNMENT_TITLE = 'create_assignment_title'
+        CREATE_ASSIGNMENT_DESCRIPTION = 'create_assignment_description'
+        CREATE_ASSIGNMENT_DATE = 'create_assignment_date'
+        CREATE_ASSIGNMENT_TIME = 'create_assignment_time'
+        
+        # حالات تعديل الواجب
+        EDIT_ASSIGNMENT_SELECT = 'edit_assignment_select'
+        EDIT_ASSIGNMENT_FIELD = 'edit_assignment_field'
+        EDIT_ASSIGNMENT_VALUE = 'edit_assignment_value'
+        
+        # حالات إدارة الطلاب
+        MANAGE_STUDENTS_LIST = 'manage_students_list'
+        MANAGE_STUDENTS_ACTION = 'manage_students_action'
+        ADD_STUDENT_MANUAL = 'add_student_manual'
+        BLOCK_STUDENT = 'block_student'
+    
+    # ==================== رسائل البوت ====================
+    
+    class Messages:
+        """رسائل البوت المعيارية"""
+        
+        # رسائل الترحيب
+        WELCOME_OWNER = """
+مرحباً بك في لوحة تحكم المالك! 👑
+
+يمكنك إدارة جميع جوانب البوت من هنا.
+استخدم الأزرار أدناه للوصول إلى الميزات.
+"""
+        
+        WELCOME_ADMIN = """
+مرحباً بك أيها الأدمن! 👨‍💼
+
+يمكنك إدارة شعبتك ونشر الواجبات.
+استخدم الأزرار أدناه للبدء.
+"""
+        
+        WELCOME_STUDENT = """
+مرحباً بك! 👋
+
+يمكنك استلام الواجبات والإشعارات من هنا.
+"""
+        
+        WELCOME_NEW_USER = """
+مرحباً بك في بوت الواجبات الجامعي! 🎓
+
+للتسجيل، استخدم رابط التسجيل الخاص بشعبتك.
+"""
+        
+        # رسائل الأخطاء
+        ERROR_GENERAL = "❌ حدث خطأ غير متوقع. الرجاء المحاولة لاحقاً."
+        ERROR_NO_PERMISSION = "❌ ليس لديك صلاحية لتنفيذ هذا الأمر."
+        ERROR_BLOCKED = "🚫 أنت محظور من استخدام البوت."
+        ERROR_INVALID_INPUT = "❌ المدخلات غير صحيحة. الرجاء المحاولة مرة أخرى."
+        ERROR_NOT_REGISTERED = "❌ أنت غير مسجل. استخدم رابط التسجيل الخاص بشعبتك."
+        
+        # رسائل النجاح
+        SUCCESS_REGISTRATION_SENT = """
+✅ تم إرسال طلب التسجيل!
+
+سيتم مراجعة طلبك من قبل الأدمن.
+سنرسل لك إشعاراً عند الموافقة.
+"""
+        
+        SUCCESS_REGISTRATION_APPROVED = """
+🎉 مبروك! تمت الموافقة على تسجيلك
+
+يمكنك الآن استلام الواجبات والإشعارات.
+"""
+        
+        SUCCESS_ASSIGNMENT_CREATED = """
+✅ تم إنشاء الواجب بنجاح!
+
+سيتم إرسال إشعارات لجميع الطلاب المسجلين.
+"""
+        
+        SUCCESS_ASSIGNMENT_EDITED = """
+✅ تم تعديل الواجب بنجاح!
+
+سيتم إرسال إشعارات التعديل للطلاب.
+"""
+        
+        # رسائل الانتظار
+        WAITING_FOR_ADMIN_APPROVAL = """
+⏳ طلبك قيد المراجعة
+
+تم إرسال طلب التسجيل للأدمن.
+الرجاء الانتظار حتى تتم الموافقة.
+"""
+        
+        SENDING_NOTIFICATIONS = """
+📤 جارِ إرسال الإشعارات...
+
+الرجاء الانتظار حتى يتم إرسال الإشعارات لجميع الطلاب.
+"""
+    
+    # ==================== أزرار لوحة المفاتيح ====================
+    
+    class Keyboards:
+        """أزرار لوحات المفاتيح (tuples ثابتة تُشارك بأمان بين الخيوط)"""
+        
+        # أزرار المالك
+        OWNER_MAIN = (
+            ('➕ إنشاء شعبة', '📋 عرض الشعب'),
+            ('👥 إدارة الأدمنز', '📊 الإحصائيات'),
+            ('⚙️ الإعدادات', '🔧 الميزات')
+        )
+        
+        # أزرار الأدمن
+        ADMIN_MAIN = (
+            ('➕ نشر واجب', '📝 الواجبات'),
+            ('👥 إدارة الطلاب', '📊 الإحصائيات'),
+            ('⏳ الطلبات المعلقة',)
+        )
+        
+        # أزرار الطالب
+        STUDENT_MAIN = (
+            ('📚 واجباتي', 'ℹ️ معلومات الشعبة'),
+        )
+        
+        # الأزرار الرئيسية حسب نوع المستخدم
+        MAIN_BY_USER_TYPE = {
+            'owner': OWNER_MAIN,
+            'admin': ADMIN_MAIN,
+            'student': STUDENT_MAIN
+        }
+        
+        # أزرار الموافقة/الرفض
+        APPROVE_REJECT = (
+            ('✅ موافقة', '❌ رفض'),
+        )
+        
+        # أزرار نعم/لا
+        YES_NO = (
+            ('نعم', 'لا'),
+        )
+        
+        # أزرار العودة والإلغاء
+        BACK_CANCEL = (
+            ('🔙 رجوع', '❌ إلغاء'),
+        )
+    
+    # ==================== الأوامر ====================
+    
+    class Commands:
+        """أوامر البوت"""
+        
+        START = 'start'
+        HELP = 'help'
+        CANCEL = 'cancel'
+        STATS = 'stats'
+        SETTINGS = 'settings'
+        
+        # أوامر المالك
+        CREATE_SECTION = 'create_section'
+        LIST_SECTIONS = 'list_sections'
+        MANAGE_ADMINS = 'manage_admins'
+        
+        # أوامر الأدمن
+        CREATE_ASSIGNMENT = 'create_assignment'
+        LIST_ASSIGNMENTS = 'list_assignments'
+        MANAGE_STUDENTS = 'manage_students'
+        PENDING_REQUESTS = 'pending_requests'
+        
+        # أوامر الطالب
+        MY_ASSIGNMENTS = 'my_assignments'
+        SECTION_INFO = 'section_info'
+    
+    # ==================== أنواع الأحداث للسجلات ====================
+    
+    class ActivityTypes:
+        """أنواع الأحداث التي يتم تسجيلها"""
+        
+        # أحداث المستخدمين
+        USER_REGISTERED = 'user_registered'
+        USER_BLOCKED = 'user_blocked'
+        USER_UNBLOCKED = 'user_unblocked'
+        
+        # أحداث الشعب
+        SECTION_CREATED = 'section_created'
+        SECTION_UPDATED = 'section_updated'
+        SECTION_DELETED = 'section_deleted'
+        ADMIN_ASSIGNED = 'admin_assigned'
+        
+        # أحداث التسجيل
+        REGISTRATION_REQUESTED = 'registration_requested'
+        REGISTRATION_APPROVED = 'registration_approved'
+        REGISTRATION_REJECTED = 'registration_rejected'
+        
+        # أحداث الواجبات
+        ASSIGNMENT_CREATED = 'assignment_created'
+        ASSIGNMENT_EDITED = 'assignment_edited'
+        ASSIGNMENT_DELETED = 'assignment_deleted'
+        NOTIFICATION_SENT = 'notification_sent'
+        
+        # أحداث الإعدادات
+        SETTING_CHANGED = 'setting_changed'
+        FEATURE_TOGGLED = 'feature_toggled'
+
+
+# الثوابت النصية للحالات والأوامر والأحداث تُقارن مع كل تحديث، فتُحفظ نسخة واحدة من كل نص
+for _constants in (ConfigConstants.States, ConfigConstants.Commands, ConfigConstants.ActivityTypes):
+    for _name, _value in list(vars(_constants).items()):
+        if isinstance(_value, str) and not _name.startswith('_'):
+            setattr(_constants, _name, sys.intern(_value))
+
+# نصوص الرسائل مكتوبة بين علامات تنصيص ثلاثية، فتُزال المسافات والأسطر الفارغة حولها مرة واحدة
+for _name, _value in list(vars(ConfigConstants.Messages).items()):
+    if isinstance(_value, str) and not _name.startswith('_'):
+        setattr(ConfigConstants.Messages, _name, textwrap.dedent(_value).strip())
+
+del _constants, _name, _value
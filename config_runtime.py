@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+الإعدادات المقروءة من متغيرات البيئة وملف .env لبوت التلغرام الجامعي
+مع التحقق من صحتها ودوال مساعدة تعتمد عليها
+"""
+
+import os
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+from dotenv import dotenv_values, find_dotenv
+
+from config_constants import ConfigConstants
+
+# مسار ملف .env (يُبحث عنه مرة واحدة)
+_DOTENV_PATH = find_dotenv()
+
+# آخر قيم مقروءة من ملف .env مع وقت تعديله: (st_mtime_ns, القيم)
+_dotenv_cache: Tuple[int, Dict[str, str]] = (-1, {})
+
+
+def _read_dotenv() -> Dict[str, str]:
+    """
+    قراءة ملف .env، مع إعادة استخدام القيم السابقة ما دام الملف لم يتغير
+    
+    Returns:
+        قاموس المتغيرات المعرّفة في الملف
+    """
+    global _dotenv_cache
+    
+    try:
+        mtime = os.stat(_DOTENV_PATH).st_mtime_ns
+    except OSError:
+        return {}
+    
+    if _dotenv_cache[0] != mtime:
+        values = {
+            key: value
+            for key, value in dotenv_values(_DOTENV_PATH).items()
+            if value is not None
+        }
+        _dotenv_cache = (mtime, values)
+    
+    return _dotenv_cache[1]
+
+
+def _read_env() -> Dict[str, str]:
+    """
+    دمج قيم ملف .env مع متغيرات البيئة دون الكتابة في os.environ
+    
+    Returns:
+        قاموس المتغيرات، وقيم بيئة العملية لها الأولوية على ملف .env
+    """
+    values = dict(_read_dotenv()) if _DOTENV_PATH else {}
+    values.update(os.environ)
+    return values
+
+
+# نسخة من متغيرات البيئة تُؤخذ مرة واحدة عند التحميل وتُقرأ منها جميع الإعدادات
+_ENV = _read_env()
+
+
+def _env(key: str, default: str = None) -> str:
+    """
+    قراءة متغير بيئة من النسخة المحفوظة
+    
+    Args:
+        key: اسم المتغير
+        default: القيمة الافتراضية
+    
+    Returns:
+        قيمة المتغير أو القيمة الافتراضية
+    """
+    return _ENV.get(key, default)
+
+
+def refresh_env() -> None:
+    """إعادة أخذ نسخة من متغيرات البيئة (الإعدادات المقروءة سابقاً لا تتغير حتى استدعاء load_settings)"""
+    values = _read_env()
+    _ENV.clear()
+    _ENV.update(values)
+
+
+def _parse_optional_int(value: str) -> int:
+    """تحويل قيمة رقمية اختيارية، وإرجاع 0 عندما تكون فارغة أو غير رقمية"""
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+# القيم التي تُعتبر True في متغيرات البيئة (مقارنة مباشرة دون lower())
+_TRUE_VALUES = frozenset((
+    'true', 'True', 'TRUE',
+    '1',
+    'yes', 'Yes', 'YES',
+    'on', 'On', 'ON'
+))
+
+
+def _parse_bool(value: str) -> bool:
+    """تحويل قيمة متغير بيئة إلى bool"""
+    return value in _TRUE_VALUES
+
+
+# جدول أنواع الإعدادات المقروءة من البيئة:
+# الاسم -> (الكلاس، دالة التحويل، القيمة الافتراضية، دالة التحقق أو None)
+_SCHEMA: Dict[str, Tuple[type, Callable[[str], Any], str, Optional[Callable[[Any], Optional[str]]]]] = {}
+
+
+def _positive(value: float) -> Optional[str]:
+    """التحقق من أن القيمة أكبر من 0"""
+    return None if value > 0 else "يجب أن يكون أكبر من 0"
+
+
+def _port(value: int) -> Optional[str]:
+    """التحقق من أن القيمة رقم منفذ صالح"""
+    return None if 0 < value < 65536 else "يجب أن يكون بين 1 و 65535"
+
+
+class _EnvSetting:
+    """
+    إعداد يُقرأ من متغيرات البيئة عند أول وصول إليه فقط
+    
+    عند أول قراءة تُحوَّل القيمة ويُستبدل الإعداد في الكلاس بقيمته النهائية،
+    فالوصول التالي قراءة عادية لخاصية الكلاس دون أي تحويل.
+    """
+    
+    def __init__(
+        self,
+        default: str,
+        cast: Callable[[str], Any] = str,
+        check: Optional[Callable[[Any], Optional[str]]] = None
+    ) -> None:
+        """
+        Args:
+            default: القيمة الافتراضية (نص كما في ملف .env)
+            cast: دالة تحويل النص إلى نوع الإعداد
+            check: دالة تحقق تُرجع وصف الخطأ أو None (تُستخدم في validate_config)
+        """
+        self.default = default
+        self.cast = cast
+        self.check = check
+        self.name = None
+    
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        _SCHEMA[name] = (owner, self.cast, self.default, self.check)
+    
+    def __get__(self, instance: Any, owner: type) -> Any:
+        value = self.cast(_env(self.name, self.default))
+        setattr(owner, self.name, value)
+        return value
+
+
+class Config(ConfigConstants):
+    """كلاس الإعدادات الرئيسي (الثوابت موروثة من ConfigConstants)"""
+    
+    # ==================== إعدادات قاعدة البيانات ====================
+    
+    # مسار قاعدة البيانات
+    DB_PATH = _EnvSetting('university_bot.db')
+    
+    # ==================== إعدادات البوت ====================
+    
+    # Telegram Bot Token (يجب تعيينه في ملف .env)
+    BOT_TOKEN = _EnvSetting('')
+    
+    # اسم البوت
+    BOT_NAME = _EnvSetting('بوت الواجبات الجامعي')
+    
+    # معرف البوت (username)
+    BOT_USERNAME = _EnvSetting('UniversityAssignmentsBot')
+    
+    # ==================== إعدادات Webhook ====================
+    
+    # استقبال التحديثات عبر webhook بدلاً من long polling (يتطلب fastapi و uvicorn)
+    USE_WEBHOOK = _EnvSetting('False', _parse_bool)
+    
+    # الرابط العام للخادم (https) الذي يرسل إليه تلغرام التحديثات
+    WEBHOOK_URL = _EnvSetting('', lambda value: value.rstrip('/'))
+    
+    # رمز سري يُستخدم كمسار للـ webhook وللتحقق من ترويسة X-Telegram-Bot-Api-Secret-Token
+    WEBHOOK_SECRET = _EnvSetting('')
+    
+    # عنوان ومنفذ الخادم المحلي
+    WEBHOOK_LISTEN = _EnvSetting('0.0.0.0')
+    WEBHOOK_PORT = _EnvSetting('8443', int, _port)
+    
+    # الحد الأقصى للاتصالات المتزامنة من تلغرام
+    WEBHOOK_MAX_CONNECTIONS = _EnvSetting('100', int)
+    
+    # ==================== إعدادات المالك ====================
+    
+    # معرف تلغرام للمالك (يجب تعيينه)
+    OWNER_TELEGRAM_ID = _EnvSetting('', _parse_optional_int)
+    
+    # اسم المالك (اختياري)
+    OWNER_NAME = _EnvSetting('المسؤول')
+    
+    # ==================== إعدادات الشعب ====================
+    
+    # الحد الأقصى للطلاب في الشعبة الواحدة
+    MAX_STUDENTS_PER_SECTION = _EnvSetting('50', int, _positive)
+    
+    # ==================== إعدادات الواجبات ====================
+    
+    # مدة صلاحية تعديل الواجب (بالساعات)
+    ASSIGNMENT_EDIT_DURATION_HOURS = _EnvSetting('24', int)
+    
+    # ==================== إعدادات التاريخ والوقت ====================
+    
+    # المنطقة الزمنية
+    TIMEZONE = _EnvSetting('Asia/Baghdad')
+    
+    # ==================== إعدادات السجلات (Logging) ====================
+    
+    # مستوى السجلات
+    LOG_LEVEL = _EnvSetting('INFO')
+    
+    # مسار ملف السجلات
+    LOG_FILE = _EnvSetting('bot.log')
+    
+    # الحد الأقصى لحجم ملف السجلات (بالميجابايت)
+    MAX_LOG_FILE_SIZE_MB = _EnvSetting('10', int)
+    
+    # عدد ملفات السجلات الاحتياطية
+    LOG_BACKUP_COUNT = _EnvSetting('5', int)
+    
+    # ==================== إعدادات الرسائل ====================
+    
+    # اللغة الافتراضية
+    DEFAULT_LANGUAGE = _EnvSetting('ar')
+    
+    # ==================== إعدادات الإشعارات ====================
+    
+    # الحد الأقصى لعدد الرسائل في الثانية لجميع عمليات الإرسال (حد تلغرام 30 رسالة/ثانية)
+    TELEGRAM_MAX_MESSAGES_PER_SECOND = _EnvSetting('30', float, _positive)
+    
+    # محادثة/قناة مصدر للبث (اختياري): تُنشر فيها رسالة الواجب مرة واحدة
+    # ثم تُنسخ للطلاب عبر copyMessage. القيمة 0 تعني الإرسال المباشر
+    NOTIFICATION_SOURCE_CHAT_ID = _EnvSetting('', lambda value: int(value or 0))
+    
+    # عدد المحاولات لإرسال الإشعار في حالة الفشل
+    NOTIFICATION_RETRY_ATTEMPTS = _EnvSetting('3', int, _positive)
+    
+    # ==================== إعدادات الأداء ====================
+    
+    # عدد الإشعارات التي تُرسل بالتوازي (حجم مجمّع خيوط الإشعارات)
+    NOTIFICATION_BATCH_SIZE = _EnvSetting('30', int, _positive)
+    
+    # مدة تجميع طلبات التسجيل لكل أدمن قبل إرسالها في رسالة واحدة (بالثواني)
+    ADMIN_NOTIFICATION_FLUSH_SECONDS = _EnvSetting('2.0', float)
+    
+    # الحد الأقصى لعدد الطلبات في رسالة واحدة للأدمن
+    ADMIN_NOTIFICATION_MAX_BATCH = _EnvSetting('10', int, _positive)
+    
+    # عدد خيوط معالجة التحديثات في البوت (استدعاءات SQLite تحجز خيطاً واحداً فقط
+    # فلا يتوقف استقبال بقية التحديثات أثناء انتظارها)
+    BOT_NUM_THREADS = _EnvSetting('8', int, _positive)
+    
+    # مهلة الاتصال بقاعدة البيانات (بالثواني)
+    DB_TIMEOUT_SECONDS = _EnvSetting('10', int)
+    
+    # مدة صلاحية الذاكرة المؤقتة للمستخدمين والشعب (بالثواني)
+    CACHE_TTL_SECONDS = _EnvSetting('60', int)
+    
+    # مدة صلاحية الذاكرة المؤقتة للمراحل والمواد (بالثواني)
+    REFERENCE_CACHE_TTL_SECONDS = _EnvSetting('300', int)
+    
+    # رابط Redis لتخزين حالات المحادثة (اختياري، مثل redis://localhost:6379/0)
+    # عند ضبطه يمكن تشغيل أكثر من نسخة من البوت وتبقى الحالات بعد إعادة التشغيل
+    REDIS_URL = _EnvSetting('')
+    
+    # بادئة مفاتيح الحالات في Redis
+    REDIS_STATE_PREFIX = _EnvSetting('drs_bot:')
+    
+    # مدة بقاء حالة المحادثة المتروكة في الذاكرة قبل حذفها (بالثواني)
+    STATE_TTL_SECONDS = _EnvSetting('1800', int)
+    
+    # ==================== التحقق عند التشغيل ====================
+    
+    @classmethod
+    def require_runtime(cls) -> None:
+        """
+        التحقق من الإعدادات الإلزامية لتشغيل البوت
+        
+        يُستدعى مرة واحدة عند بدء التشغيل، فيبقى استيراد الإعدادات ممكناً
+        للأدوات التي تحتاج الثوابت فقط دون ملف .env كامل
+        
+        Raises:
+            ValueError: إذا كان BOT_TOKEN أو OWNER_TELEGRAM_ID غير معيّن أو غير صالح
+        """
+        if not cls.BOT_TOKEN:
+            raise ValueError(
+                "❌ خطأ: لم يتم تعيين BOT_TOKEN\n"
+                "الرجاء إنشاء ملف .env وإضافة:\n"
+                "BOT_TOKEN=your_bot_token_here"
+            )
+        
+        if not _env('OWNER_TELEGRAM_ID'):
+            raise ValueError(
+                "❌ خطأ: لم يتم تعيين OWNER_TELEGRAM_ID\n"
+                "الرجاء إضافة في ملف .env:\n"
+                "OWNER_TELEGRAM_ID=your_telegram_id"
+            )
+        
+        if not cls.OWNER_TELEGRAM_ID:
+            raise ValueError("❌ خطأ: OWNER_TELEGRAM_ID يجب أن يكون رقم")
+
+
+class Development:
+    """إعدادات خاصة ببيئة التطوير"""
+    
+    # تفعيل وضع التطوير
+    DEBUG_MODE = _EnvSetting('False', _parse_bool)
+    
+    # إظهار رسائل SQL في وضع التطوير
+    SHOW_SQL_QUERIES = _EnvSetting('False', _parse_bool)
+    
+    # تفعيل الاختبارات التلقائية
+    AUTO_TESTING = _EnvSetting('False', _parse_bool)
+
+
+# ==================== دوال مساعدة ====================
+
+def load_settings() -> None:
+    """
+    قراءة جميع الإعدادات من جدول الأنواع دفعة واحدة
+    
+    تستبدل كل إعداد بقيمته المحوّلة من النسخة الحالية لمتغيرات البيئة،
+    فتُستخدم بعد refresh_env() لتطبيق القيم الجديدة
+    """
+    for name, (owner, cast, default, _check) in _SCHEMA.items():
+        setattr(owner, name, cast(_ENV.get(name, default)))
+    
+    # روابط البوت مبنية من BOT_USERNAME فيُعاد بناؤها بعد تغيّر الإعدادات
+    _bot_links.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _bot_links() -> Tuple[str, str]:
+    """
+    رابط البوت الأساسي وبادئة رابط التسجيل، يُبنيان مرة واحدة عند أول استخدام
+    
+    Returns:
+        (https://t.me/<username>, https://t.me/<username>?start=)
+    """
+    base_url = f"https://t.me/{Config.BOT_USERNAME}"
+    return base_url, f"{base_url}?start="
+
+
+def get_bot_link(code: str = '') -> str:
+    """
+    إنشاء رابط البوت
+    
+    Args:
+        code: كود الشعبة (اختياري)
+    
+    Returns:
+        رابط البوت الكامل
+    """
+    base_url, start_prefix = _bot_links()
+    return start_prefix + code if code else base_url
+
+
+# ==================== التحقق من الإعدادات ====================
+
+def validate_config() -> bool:
+    """
+    التحقق من صحة الإعدادات
+    
+    Returns:
+        True إذا كانت الإعدادات صحيحة
+    """
+    errors = []
+    
+    # التحقق من وجود BOT_TOKEN
+    if not Config.BOT_TOKEN:
+        errors.append("BOT_TOKEN غير موجود")
+    
+    # التحقق من وجود OWNER_TELEGRAM_ID وأنه رقم
+    if not _env('OWNER_TELEGRAM_ID'):
+        errors.append("OWNER_TELEGRAM_ID غير موجود")
+    elif not Config.OWNER_TELEGRAM_ID:
+        errors.append("OWNER_TELEGRAM_ID يجب أن يكون رقم")
+    
+    # التحقق من الإعدادات المقروءة من البيئة حسب جدول الأنواع
+    for name, (owner, _cast, _default, check) in _SCHEMA.items():
+        try:
+            value = getattr(owner, name)
+        except ValueError:
+            errors.append(f"{name} قيمة غير صالحة")
+            continue
+        
+        if check:
+            error = check(value)
+            if error:
+                errors.append(f"{name} {error}")
+    
+    # التحقق من إعدادات webhook
+    if Config.USE_WEBHOOK and not Config.WEBHOOK_URL:
+        errors.append("WEBHOOK_URL مطلوب عند تفعيل USE_WEBHOOK")
+    
+    if errors:
+        # كتابة واحدة لكل الأخطاء بدلاً من print لكل سطر
+        lines = ["❌ أخطاء في الإعدادات:"]
+        lines.extend(f"  - {error}" for error in errors)
+        sys.stderr.write('\n'.join(lines) + '\n')
+        return False
+    
+    return True
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+أدوات تهيئة بيئة تشغيل البوت لمرة واحدة
+إنشاء المجلدات المطلوبة وملف .env نموذجي، خارج مسار استيراد config.py
+"""
+
+import os
+
+
+# ==================== المجلدات ====================
+
+# المجلدات المطلوبة لتشغيل البوت
+REQUIRED_DIRECTORIES = ('logs', 'backups', 'temp')
+
+
+def ensure_directories() -> None:
+    """إنشاء المجلدات المطلوبة إذا لم تكن موجودة"""
+    for directory in REQUIRED_DIRECTORIES:
+        # التحقق أولاً يتجنب استثناء FileExistsError في التشغيلات التالية
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+
+
+# ==================== مثال ملف .env ====================
+
+ENV_TEMPLATE = """
+# Telegram Bot Configuration
+BOT_TOKEN=your_bot_token_here
+BOT_USERNAME=UniversityAssignmentsBot
+BOT_NAME=بوت الواجبات الجامعي
+
+# Webhook Configuration (optional)
+USE_WEBHOOK=False
+WEBHOOK_URL=
+WEBHOOK_SECRET=
+WEBHOOK_LISTEN=0.0.0.0
+WEBHOOK_PORT=8443
+WEBHOOK_MAX_CONNECTIONS=100
+
+# Owner Configuration
+OWNER_TELEGRAM_ID=123456789
+OWNER_NAME=المسؤول
+
+# Database Configuration
+DB_PATH=university_bot.db
+
+# Section Configuration
+MAX_STUDENTS_PER_SECTION=50
+
+# Assignment Configuration
+ASSIGNMENT_EDIT_DURATION_HOURS=24
+
+# Timezone Configuration
+TIMEZONE=Asia/Baghdad
+
+# Logging Configuration
+LOG_LEVEL=INFO
+LOG_FILE=bot.log
+MAX_LOG_FILE_SIZE_MB=10
+LOG_BACKUP_COUNT=5
+
+# Notification Configuration
+TELEGRAM_MAX_MESSAGES_PER_SECOND=30
+NOTIFICATION_RETRY_ATTEMPTS=3
+NOTIFICATION_BATCH_SIZE=30
+NOTIFICATION_SOURCE_CHAT_ID=0
+ADMIN_NOTIFICATION_FLUSH_SECONDS=2.0
+ADMIN_NOTIFICATION_MAX_BATCH=10
+
+# Performance Configuration
+BOT_NUM_THREADS=8
+DB_TIMEOUT_SECONDS=10
+CACHE_TTL_SECONDS=60
+REFERENCE_CACHE_TTL_SECONDS=300
+REDIS_URL=
+REDIS_STATE_PREFIX=drs_bot:
+STATE_TTL_SECONDS=1800
+
+# Development Configuration (optional)
+DEBUG_MODE=False
+SHOW_SQL_QUERIES=False
+AUTO_TESTING=False
+"""
+
+
+def create_env_template():
+    """إنشاء ملف .env نموذجي إذا لم يكن موجوداً"""
+    if not os.path.exists('.env'):
+        with open('.env', 'w', encoding='utf-8') as f:
+            f.write(ENV_TEMPLATE.strip())
+        print("✅ تم إنشاء ملف .env نموذجي")
+        print("⚠️  الرجاء تعديل القيم في ملف .env قبل تشغيل البوت")
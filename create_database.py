@@ -9,7 +9,8 @@ import sys
 import sqlite3
 import logging
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Tuple
 
 # حل مشكلة encoding في Windows
 if sys.platform.startswith('win'):
@@ -24,12 +25,101 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('database_creation.log', encoding='utf-8'),
+        # delay: لا يُفتح ملف السجلات إلا عند أول رسالة (وليس عند استيراد الوحدة)
+        logging.FileHandler('database_creation.log', encoding='utf-8', delay=True),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# مدة انتظار قفل قاعدة البيانات (بالثواني)
+BUSY_TIMEOUT_SECONDS = 30.0
+
+# حجم صفحة قاعدة البيانات عند إنشائها (بالبايت)
+PAGE_SIZE = 8192
+
+# إعدادات أداء الاتصال: ذاكرة مؤقتة للصفحات، جداول مؤقتة في الذاكرة،
+# وعدم تنفيذ الدوال من تعريفات المخطط (views/triggers)
+CONNECTION_PRAGMAS = """
+    PRAGMA cache_size = -16000;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA trusted_schema = OFF;
+"""
+
+# القراءة عبر mmap (256MB) فقط في إصدارات Python بنظام 64-bit
+if sys.maxsize > 2**32:
+    CONNECTION_PRAGMAS += "    PRAGMA mmap_size = 268435456;\n"
+
+# مخطط قاعدة البيانات في schema.sql: الجداول أولاً ثم الفهارس بعد فاصل "الفهارس"،
+# فتُنشأ الجداول، ثم تُضاف البيانات الأولية، ثم الفهارس
+SCHEMA_FILE = Path(__file__).with_name('schema.sql')
+INDEXES_MARKER = '-- ==================== الفهارس ===================='
+
+
+def load_schema(path: Path = SCHEMA_FILE) -> Tuple[str, str]:
+    """
+    قراءة ملف المخطط وفصل الجداول عن الفهارس
+    
+    Args:
+        path: مسار ملف المخطط
+    
+    Returns:
+        (نص إنشاء الجداول، نص إنشاء الفهارس)
+    """
+    sql = path.read_text(encoding='utf-8')
+    tables_sql, _, indexes_sql = sql.partition(INDEXES_MARKER)
+    return tables_sql, indexes_sql
+
+
+SCHEMA_SQL, INDEXES_SQL = load_schema()
+
+# أعمدة الأوقات (Unix timestamp) التي قد تحتوي نصوص ISO من إصدارات سابقة
+TIMESTAMP_COLUMNS = (
+    ('users', 'created_at'),
+    ('users', 'last_active'),
+    ('academic_levels', 'created_at'),
+    ('sections', 'created_at'),
+    ('student_sections', 'registered_at'),
+    ('student_sections', 'approved_at'),
+    ('subjects', 'created_at'),
+    ('subjects_stages', 'created_at'),
+    ('assignments', 'deadline'),
+    ('assignments', 'created_at'),
+    ('assignments', 'updated_at'),
+    ('assignment_edits', 'old_deadline'),
+    ('assignment_edits', 'edited_at'),
+    ('assignment_notifications', 'sent_at'),
+    ('activity_logs', 'created_at'),
+    ('bot_settings', 'updated_at'),
+    ('bot_features', 'updated_at')
+)
+
+
+# صيغة UPSERT (ON CONFLICT ... DO NOTHING) مدعومة منذ SQLite 3.24
+UPSERT_SUPPORTED = sqlite3.sqlite_version_info >= (3, 24, 0)
+
+
+def seed_insert_sql(table: str, columns: Tuple[str, ...], conflict_columns: Tuple[str, ...] = ()) -> str:
+    """
+    بناء جملة إدراج تتجاهل الصفوف الموجودة مسبقاً (للبيانات الأولية)
+    
+    Args:
+        table: اسم الجدول
+        columns: أعمدة الإدراج
+        conflict_columns: أعمدة القيد UNIQUE المعني (فارغة = أي قيد فريد في الجدول)
+    
+    Returns:
+        INSERT ... ON CONFLICT DO NOTHING، أو INSERT OR IGNORE في إصدارات SQLite الأقدم
+    """
+    column_list = ', '.join(columns)
+    placeholders = ', '.join('?' * len(columns))
+    
+    if not UPSERT_SUPPORTED:
+        return f"INSERT OR IGNORE INTO {table} ({column_list}) VALUES ({placeholders})"
+    
+    target = f"({', '.join(conflict_columns)})" if conflict_columns else ''
+    return f"INSERT INTO {table} ({column_list}) VALUES ({placeholders}) ON CONFLICT{target} DO NOTHING"
+
 
 class DatabaseCreator:
     """
@@ -49,233 +139,103 @@ class DatabaseCreator:
     def connect(self) -> None:
         """إنشاء اتصال بقاعدة البيانات"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            # timeout يضبط busy_timeout: الانتظار حتى 30 ثانية إذا كان البوت يكتب في نفس الملف
+            # بدلاً من فشل فوري بـ "database is locked". المعاملات تُفتح صراحة بـ BEGIN IMMEDIATE
+            self.conn = sqlite3.connect(
+                self.db_path,
+                timeout=BUSY_TIMEOUT_SECONDS,
+                isolation_level=None
+            )
             self.conn.execute("PRAGMA foreign_keys = ON")  # تفعيل المفاتيح الأجنبية
-            logger.info(f"✅ تم الاتصال بقاعدة البيانات: {self.db_path}")
+            
+            # حجم الصفحة و auto_vacuum لا يُحفظان إلا في قاعدة بيانات فارغة، فيُضبطان
+            # قبل WAL وقبل إنشاء أي جدول:
+            # - صفحات 8KB تقلل صفحات الفائض لنصوص الواجبات والسجلات الطويلة
+            # - auto_vacuum تدريجي لاستعادة الصفحات المحررة عبر incremental_vacuum دون VACUUM كامل
+            if self.conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+                self.conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+                self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            
+            # وضع WAL يُحفظ في ملف قاعدة البيانات نفسه، فيعمل البوت عليه من أول تشغيل
+            # (الملف محلي ويُفتح من عملية واحدة، وهي الحالة التي يناسبها WAL)
+            journal_mode = self.conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            self.conn.execute("PRAGMA synchronous = NORMAL")  # آمن مع WAL وأسرع من FULL
+            self.conn.execute("PRAGMA wal_autocheckpoint = 1000")  # نقل WAL للملف كل 1000 صفحة
+            self.conn.executescript(CONNECTION_PRAGMAS)
+            
+            logger.info("📝 وضع السجل: %s", journal_mode)
+            logger.info("✅ تم الاتصال بقاعدة البيانات: %s", self.db_path)
         except Exception as e:
-            logger.error(f"❌ خطأ في الاتصال بقاعدة البيانات: {e}")
+            logger.error("❌ خطأ في الاتصال بقاعدة البيانات: %s", e)
             raise
     
     def close(self) -> None:
         """إغلاق الاتصال بقاعدة البيانات"""
         if self.conn:
+            try:
+                # تحديث إحصاءات مخطط الاستعلامات عند الحاجة قبل الإغلاق
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.error("❌ خطأ في تحسين قاعدة البيانات: %s", e)
             self.conn.close()
+            self.conn = None
             logger.info("✅ تم إغلاق الاتصال بقاعدة البيانات")
     
+    def __enter__(self) -> 'DatabaseCreator':
+        """فتح الاتصال عند الدخول في with"""
+        self.connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """إغلاق الاتصال (مع PRAGMA optimize) في جميع الحالات، حتى عند حدوث خطأ"""
+        self.close()
+    
+    def incremental_vacuum(self, pages: int = 1000) -> None:
+        """
+        إعادة الصفحات الفارغة إلى نظام الملفات (صيانة دورية)
+        
+        Args:
+            pages: الحد الأقصى لعدد الصفحات المُستعادة في المرة الواحدة
+        """
+        try:
+            # execute() ينفذ خطوة واحدة فقط (صفحة واحدة)، بينما executescript ينفذ الأمر كاملاً
+            self.conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            logger.info("✅ تمت استعادة الصفحات الفارغة (حتى %s صفحة)", pages)
+        except sqlite3.Error as e:
+            logger.error("❌ خطأ في استعادة الصفحات الفارغة: %s", e)
+            raise
+    
     def create_tables(self) -> None:
         """إنشاء جميع الجداول المطلوبة"""
         
-        cursor = self.conn.cursor()
-        
         try:
-            # ==================== جدول المستخدمين ====================
-            logger.info("📝 إنشاء جدول المستخدمين...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    telegram_id INTEGER UNIQUE NOT NULL,
-                    username TEXT,
-                    full_name TEXT NOT NULL,
-                    user_type TEXT NOT NULL CHECK(user_type IN ('owner', 'admin', 'student')),
-                    is_active INTEGER DEFAULT 1,
-                    is_blocked INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_telegram_id ON users(telegram_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_type ON users(user_type)")
-            
-            # ==================== جدول المراحل الدراسية ====================
-            logger.info("📝 إنشاء جدول المراحل الدراسية...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS academic_levels (
-                    level_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    level_name TEXT UNIQUE NOT NULL,
-                    level_number INTEGER UNIQUE NOT NULL,
-                    is_active INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # ==================== جدول الشعب ====================
-            logger.info("📝 إنشاء جدول الشعب...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sections (
-                    section_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    section_name TEXT NOT NULL,
-                    level_id INTEGER NOT NULL,
-                    study_type TEXT NOT NULL CHECK(study_type IN ('صباحي', 'مسائي')),
-                    division TEXT NOT NULL CHECK(division IN ('A', 'B')),
-                    admin_id INTEGER,
-                    join_code TEXT UNIQUE NOT NULL,
-                    max_students INTEGER DEFAULT 50,
-                    is_active INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (level_id) REFERENCES academic_levels(level_id),
-                    FOREIGN KEY (admin_id) REFERENCES users(user_id),
-                    UNIQUE(level_id, study_type, division)
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_join_code ON sections(join_code)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_admin_id ON sections(admin_id)")
-            
-            # ==================== جدول الطلاب في الشعب ====================
-            logger.info("📝 إنشاء جدول الطلاب في الشعب...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS student_sections (
-                    student_section_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id INTEGER NOT NULL,
-                    section_id INTEGER NOT NULL,
-                    registration_status TEXT NOT NULL DEFAULT 'pending' 
-                        CHECK(registration_status IN ('pending', 'approved', 'rejected')),
-                    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    approved_at TIMESTAMP,
-                    approved_by INTEGER,
-                    is_active INTEGER DEFAULT 1,
-                    FOREIGN KEY (student_id) REFERENCES users(user_id),
-                    FOREIGN KEY (section_id) REFERENCES sections(section_id),
-                    FOREIGN KEY (approved_by) REFERENCES users(user_id),
-                    UNIQUE(student_id, section_id)
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_student_section ON student_sections(student_id, section_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_registration_status ON student_sections(registration_status)")
-            
-            # ==================== جدول المواد ====================
-            logger.info("📝 إنشاء جدول المواد...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS subjects (
-                    subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    subject_name TEXT UNIQUE NOT NULL,
-                    description TEXT,
-                    is_active INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # ==================== جدول ربط المواد بالمراحل ====================
-            logger.info("📝 إنشاء جدول ربط المواد بالمراحل...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS subjects_stages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    subject_id INTEGER NOT NULL,
-                    stage_id INTEGER NOT NULL,
-                    is_active INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE CASCADE,
-                    FOREIGN KEY (stage_id) REFERENCES academic_levels(level_id) ON DELETE CASCADE,
-                    UNIQUE(subject_id, stage_id)
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_subject_stage ON subjects_stages(subject_id, stage_id)")
-            
-            # ==================== جدول الواجبات ====================
-            logger.info("📝 إنشاء جدول الواجبات...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS assignments (
-                    assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    section_id INTEGER NOT NULL,
-                    subject_id INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    deadline TIMESTAMP NOT NULL,
-                    created_by INTEGER NOT NULL,
-                    is_active INTEGER DEFAULT 1,
-                    is_edited INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (section_id) REFERENCES sections(section_id),
-                    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id),
-                    FOREIGN KEY (created_by) REFERENCES users(user_id)
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_section_assignment ON assignments(section_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_deadline ON assignments(deadline)")
-            
-            # ==================== جدول تعديلات الواجبات ====================
-            logger.info("📝 إنشاء جدول تعديلات الواجبات...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS assignment_edits (
-                    edit_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assignment_id INTEGER NOT NULL,
-                    old_title TEXT,
-                    old_description TEXT,
-                    old_deadline TIMESTAMP,
-                    edited_by INTEGER NOT NULL,
-                    edited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id),
-                    FOREIGN KEY (edited_by) REFERENCES users(user_id)
-                )
-            """)
-            
-            # ==================== جدول إشعارات الواجبات ====================
-            logger.info("📝 إنشاء جدول إشعارات الواجبات...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS assignment_notifications (
-                    notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assignment_id INTEGER NOT NULL,
-                    student_id INTEGER NOT NULL,
-                    notification_type TEXT NOT NULL CHECK(notification_type IN ('new', 'edit', 'delete', 'reminder')),
-                    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    delivery_status TEXT DEFAULT 'sent' CHECK(delivery_status IN ('sent', 'failed', 'blocked')),
-                    FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id),
-                    FOREIGN KEY (student_id) REFERENCES users(user_id)
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_assignment_notification ON assignment_notifications(assignment_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_student_notification ON assignment_notifications(student_id)")
+            logger.info("📝 إنشاء %s جدول...", SCHEMA_SQL.count('CREATE TABLE'))
             
-            # ==================== جدول السجلات ====================
-            logger.info("📝 إنشاء جدول السجلات...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS activity_logs (
-                    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER,
-                    action_type TEXT NOT NULL,
-                    action_details TEXT,
-                    target_type TEXT,
-                    target_id INTEGER,
-                    ip_address TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_action_type ON activity_logs(action_type)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON activity_logs(created_at)")
+            # executescript يحفظ أي معاملة معلقة قبل التنفيذ، فتُفتح المعاملة داخل النص نفسه
+            # ليبقى إنشاء المخطط كله حفظاً واحداً
+            self.conn.executescript(f"BEGIN IMMEDIATE;\n{SCHEMA_SQL}\nCOMMIT;")
             
-            # ==================== جدول إعدادات البوت ====================
-            logger.info("📝 إنشاء جدول إعدادات البوت...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bot_settings (
-                    setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    setting_key TEXT UNIQUE NOT NULL,
-                    setting_value TEXT NOT NULL,
-                    setting_type TEXT NOT NULL CHECK(setting_type IN ('string', 'integer', 'boolean', 'json')),
-                    description TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # ==================== جدول الميزات ====================
-            logger.info("📝 إنشاء جدول الميزات...")
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bot_features (
-                    feature_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    feature_key TEXT UNIQUE NOT NULL,
-                    feature_name TEXT NOT NULL,
-                    is_enabled INTEGER DEFAULT 0,
-                    description TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            self.conn.commit()
             logger.info("✅ تم إنشاء جميع الجداول بنجاح")
             
         except Exception as e:
             self.conn.rollback()
-            logger.error(f"❌ خطأ في إنشاء الجداول: {e}")
+            logger.error("❌ خطأ في إنشاء الجداول: %s", e)
+            raise
+    
+    def create_indexes(self) -> None:
+        """إنشاء الفهارس (بعد إضافة البيانات)"""
+        
+        try:
+            logger.info("📝 إنشاء %s فهرس...", INDEXES_SQL.count('CREATE INDEX'))
+            self.conn.executescript(f"BEGIN IMMEDIATE;\n{INDEXES_SQL}\nCOMMIT;")
+            
+            # إحصاءات أولية للفهارس حتى تستخدمها أول استعلامات البوت
+            self.conn.execute("ANALYZE")
+            logger.info("✅ تم إنشاء الفهارس بنجاح")
+        
+        except Exception as e:
+            self.conn.rollback()
+            logger.error("❌ خطأ في إنشاء الفهارس: %s", e)
             raise
     
     def insert_initial_data(self) -> None:
@@ -284,8 +244,13 @@ class DatabaseCreator:
         cursor = self.conn.cursor()
         
         try:
+            # جميع البيانات الأولية في معاملة واحدة تأخذ قفل الكتابة من البداية
+            # وتُحفظ بـ commit واحد في النهاية
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            logger.info("📝 إضافة البيانات الأولية...")
+            
             # ==================== إضافة المراحل الدراسية ====================
-            logger.info("📝 إضافة المراحل الدراسية...")
             academic_levels = [
                 ('المرحلة الأولى', 1),
                 ('المرحلة الثانية', 2),
@@ -293,13 +258,11 @@ class DatabaseCreator:
                 ('المرحلة الرابعة', 4)
             ]
             
-            cursor.executemany("""
-                INSERT OR IGNORE INTO academic_levels (level_name, level_number)
-                VALUES (?, ?)
-            """, academic_levels)
+            cursor.executemany(seed_insert_sql(
+                'academic_levels', ('level_name', 'level_number')
+            ), academic_levels)
             
             # ==================== إضافة مواد افتراضية ====================
-            logger.info("📝 إضافة المواد الافتراضية...")
             subjects = [
                 ('برمجة 1', 'أساسيات البرمجة'),
                 ('قواعد البيانات', 'تصميم وإدارة قواعد البيانات'),
@@ -308,13 +271,11 @@ class DatabaseCreator:
                 ('هندسة البرمجيات', 'مبادئ هندسة البرمجيات')
             ]
             
-            cursor.executemany("""
-                INSERT OR IGNORE INTO subjects (subject_name, description)
-                VALUES (?, ?)
-            """, subjects)
+            cursor.executemany(seed_insert_sql(
+                'subjects', ('subject_name', 'description'), ('subject_name',)
+            ), subjects)
             
             # ==================== ربط المواد بالمراحل ====================
-            logger.info("📝 ربط المواد بالمراحل الدراسية...")
             subjects_stages_data = [
                 (1, 1),  # برمجة 1 - المرحلة الأولى
                 (2, 2),  # قواعد البيانات - المرحلة الثانية
@@ -323,13 +284,11 @@ class DatabaseCreator:
                 (5, 4),  # هندسة البرمجيات - المرحلة الرابعة
             ]
             
-            cursor.executemany("""
-                INSERT OR IGNORE INTO subjects_stages (subject_id, stage_id)
-                VALUES (?, ?)
-            """, subjects_stages_data)
+            cursor.executemany(seed_insert_sql(
+                'subjects_stages', ('subject_id', 'stage_id'), ('subject_id', 'stage_id')
+            ), subjects_stages_data)
             
             # ==================== إضافة إعدادات البوت ====================
-            logger.info("📝 إضافة إعدادات البوت...")
             bot_settings = [
                 ('bot_name', 'بوت الواجبات الجامعي', 'string', 'اسم البوت'),
                 ('default_language', 'ar', 'string', 'اللغة الافتراضية'),
@@ -338,13 +297,11 @@ class DatabaseCreator:
                 ('assignment_edit_duration', '24', 'integer', 'مدة صلاحية تعديل الواجب (بالساعات)')
             ]
             
-            cursor.executemany("""
-                INSERT OR IGNORE INTO bot_settings (setting_key, setting_value, setting_type, description)
-                VALUES (?, ?, ?, ?)
-            """, bot_settings)
+            cursor.executemany(seed_insert_sql(
+                'bot_settings', ('setting_key', 'setting_value', 'setting_type', 'description'), ('setting_key',)
+            ), bot_settings)
             
             # ==================== إضافة الميزات ====================
-            logger.info("📝 إضافة الميزات...")
             bot_features = [
                 ('warnings_system', 'نظام التحذيرات', 0, 'نظام إصدار تحذيرات للطلاب'),
                 ('leaderboards', 'القوائم التصنيفية', 0, 'عرض ترتيب الطلاب'),
@@ -353,17 +310,46 @@ class DatabaseCreator:
                 ('student_blocking', 'نظام الحظر', 1, 'إمكانية حظر الطلاب')
             ]
             
-            cursor.executemany("""
-                INSERT OR IGNORE INTO bot_features (feature_key, feature_name, is_enabled, description)
-                VALUES (?, ?, ?, ?)
-            """, bot_features)
+            cursor.executemany(seed_insert_sql(
+                'bot_features', ('feature_key', 'feature_name', 'is_enabled', 'description'), ('feature_key',)
+            ), bot_features)
             
             self.conn.commit()
             logger.info("✅ تم إضافة البيانات الأولية بنجاح")
             
         except Exception as e:
             self.conn.rollback()
-            logger.error(f"❌ خطأ في إضافة البيانات الأولية: {e}")
+            logger.error("❌ خطأ في إضافة البيانات الأولية: %s", e)
+            raise
+    
+    def migrate_timestamps(self) -> None:
+        """
+        تحويل الأوقات المخزنة كنص ISO (الإصدارات السابقة، ومنها CURRENT_TIMESTAMP)
+        إلى Unix timestamp صحيح
+        """
+        
+        cursor = self.conn.cursor()
+        
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            migrated = 0
+            for table, column in TIMESTAMP_COLUMNS:
+                cursor.execute(f"""
+                    UPDATE {table}
+                    SET {column} = CAST(strftime('%s', {column}) AS INTEGER)
+                    WHERE typeof({column}) = 'text'
+                """)
+                migrated += cursor.rowcount
+            
+            self.conn.commit()
+            
+            if migrated:
+                logger.info("✅ تم تحويل %s قيمة وقت إلى Unix timestamp", migrated)
+        
+        except Exception as e:
+            self.conn.rollback()
+            logger.error("❌ خطأ في تحويل الأوقات: %s", e)
             raise
     
     def create_database(self) -> bool:
@@ -376,16 +362,17 @@ class DatabaseCreator:
         try:
             logger.info("🚀 بدء عملية إنشاء قاعدة البيانات...")
             
-            self.connect()
-            self.create_tables()
-            self.insert_initial_data()
-            self.close()
+            with self:
+                self.create_tables()
+                self.insert_initial_data()
+                self.migrate_timestamps()
+                self.create_indexes()
             
             logger.info("✅✅✅ تم إنشاء قاعدة البيانات بنجاح!")
             return True
             
         except Exception as e:
-            logger.error(f"❌❌❌ فشل إنشاء قاعدة البيانات: {e}")
+            logger.error("❌❌❌ فشل إنشاء قاعدة البيانات: %s", e)
             return False
 
 
@@ -7,6 +7,7 @@
 
 import sqlite3
 import logging
+import threading
 from datetime import datetime
 from typing import Optional, List, Tuple, Dict, Any
 from contextlib import contextmanager
@@ -14,7 +15,7 @@ from contextlib import contextmanager
 from config import Config
 from helpers import (
     CodeGenerator, DateTimeHelper, MessageFormatter,
-    Validator, PermissionChecker
+    Validator, PermissionChecker, TTLCache
 )
 
 # إعداد نظام السجلات
@@ -24,12 +25,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ذاكرة مؤقتة لصفوف المستخدمين والشعب (تُقرأ في كل تحديث تقريباً)
+_user_cache = TTLCache(Config.CACHE_TTL_SECONDS, Config.CACHE_MAX_SIZE)
+_section_cache = TTLCache(Config.CACHE_TTL_SECONDS, Config.CACHE_MAX_SIZE)
+
+# البيانات المرجعية (المراحل والمواد) نادراً ما تتغير فتُحفظ لمدة أطول، وتُبطل
+# صراحة بعد تعديلها من البوت (أو تنتهي صلاحيتها بعد تعديل قاعدة البيانات مباشرة)
+_reference_cache = TTLCache(Config.REFERENCE_CACHE_TTL_SECONDS, max_size=2)
+
+
+# اتصال واحد لكل خيط يُعاد استخدامه بدلاً من فتح اتصال جديد في كل استدعاء
+_thread_local = threading.local()
+
+# كاتب واحد في كل مرة: خيوط الكتابة تنتظر هنا بدلاً من تكرار محاولة قفل SQLite
+# (القراءة في وضع WAL لا تحتاج هذا القفل)
+_write_lock = threading.RLock()
+
+
+def _open_connection(db_path: str) -> sqlite3.Connection:
+    """
+    فتح اتصال جديد بقاعدة البيانات وضبط إعداداته
+    
+    Args:
+        db_path: مسار قاعدة البيانات
+    
+    Returns:
+        اتصال قاعدة البيانات
+    """
+    conn = sqlite3.connect(db_path, timeout=Config.DB_TIMEOUT_SECONDS)
+    conn.row_factory = sqlite3.Row  # للحصول على النتائج كـ dictionary
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")  # القراءة لا تنتظر الكتابة
+    conn.execute("PRAGMA synchronous = NORMAL")  # آمن مع WAL وأسرع من FULL
+    conn.execute("PRAGMA cache_size = -20000")  # ~20MB ذاكرة مؤقتة للصفحات
+    conn.execute("PRAGMA mmap_size = 268435456")  # 256MB قراءة عبر mmap
+    conn.execute("PRAGMA temp_store = MEMORY")  # جداول الفرز المؤقتة في الذاكرة
+    return conn
+
 
 @contextmanager
 def get_db_connection(db_path: str = None):
     """
     Context manager للحصول على اتصال بقاعدة البيانات
     
+    يُعاد استخدام نفس الاتصال داخل الخيط الواحد، والاستدعاءات المتداخلة
+    (مثل تسجيل الحدث داخل عملية أخرى) تشارك نفس المعاملة
+    
     Args:
         db_path: مسار قاعدة البيانات (اختياري)
     
@@ -39,20 +80,47 @@ def get_db_connection(db_path: str = None):
     if db_path is None:
         db_path = Config.DB_PATH
     
-    conn = None
+    connections = getattr(_thread_local, 'connections', None)
+    if connections is None:
+        connections = _thread_local.connections = {}
+    
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = _open_connection(db_path)
+    
+    depth = getattr(_thread_local, 'depth', 0) + 1
+    _thread_local.depth = depth
+    
     try:
-        conn = sqlite3.connect(db_path, timeout=Config.DB_TIMEOUT_SECONDS)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.row_factory = sqlite3.Row  # للحصول على النتائج كـ dictionary
         yield conn
     except Exception as e:
-        if conn:
+        # التراجع يقرره السياق الخارجي فقط
+        if depth == 1:
             conn.rollback()
-        logger.error(f"خطأ في الاتصال بقاعدة البيانات: {e}")
+        logger.error("خطأ في الاتصال بقاعدة البيانات: %s", e)
         raise
     finally:
-        if conn:
-            conn.close()
+        _thread_local.depth = depth - 1
+        
+        # إلغاء أي معاملة لم تُثبَّت (مثل الخروج المبكر بعد UPDATE)
+        if depth == 1 and conn.in_transaction:
+            conn.rollback()
+
+
+@contextmanager
+def get_db_write_connection(db_path: str = None):
+    """
+    Context manager لعمليات الكتابة: نفس اتصال الخيط مع قفل الكاتب
+    
+    Args:
+        db_path: مسار قاعدة البيانات (اختياري)
+    
+    Yields:
+        اتصال قاعدة البيانات
+    """
+    with _write_lock:
+        with get_db_connection(db_path) as conn:
+            yield conn
 
 
 # ==================== دوال المستخدمين ====================
@@ -91,7 +159,7 @@ class UserDatabase:
             if user_type not in ['owner', 'admin', 'student']:
                 return False, "نوع المستخدم غير صحيح", None
             
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # التحقق من عدم وجود المستخدم مسبقاً
@@ -111,15 +179,16 @@ class UserDatabase:
                 
                 user_id = cursor.lastrowid
                 conn.commit()
+                UserDatabase.invalidate_user(telegram_id)
                 
-                logger.info(f"✅ تم إنشاء مستخدم جديد: {full_name} ({user_type})")
+                logger.info("✅ تم إنشاء مستخدم جديد: %s (%s)", full_name, user_type)
                 return True, "تم إنشاء المستخدم بنجاح", user_id
                 
         except sqlite3.IntegrityError as e:
-            logger.error(f"❌ خطأ في تكرار البيانات: {e}")
+            logger.error("❌ خطأ في تكرار البيانات: %s", e)
             return False, "المستخدم موجود مسبقاً", None
         except Exception as e:
-            logger.error(f"❌ خطأ في إنشاء المستخدم: {e}")
+            logger.error("❌ خطأ في إنشاء المستخدم: %s", e)
             return False, f"خطأ غير متوقع: {e}", None
     
     @staticmethod
@@ -133,6 +202,10 @@ class UserDatabase:
         Returns:
             قاموس يحتوي على معلومات المستخدم أو None
         """
+        cached = _user_cache.get(telegram_id)
+        if cached is not None:
+            return dict(cached)
+        
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
@@ -144,14 +217,62 @@ class UserDatabase:
                 row = cursor.fetchone()
                 
                 if row:
-                    return dict(row)
+                    user = dict(row)
+                    _user_cache.set(telegram_id, user)
+                    return dict(user)
                 
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب المستخدم: {e}")
+            logger.error("❌ خطأ في جلب المستخدم: %s", e)
             return None
     
+    @staticmethod
+    def get_user_status(telegram_id: int) -> Optional[Tuple[str, bool]]:
+        """
+        الحصول على نوع المستخدم وحالة الحظر فقط
+        
+        Args:
+            telegram_id: معرف تلغرام
+        
+        Returns:
+            (نوع المستخدم: str, محظور: bool) أو None إذا لم يكن موجوداً
+        """
+        cached = _user_cache.get(telegram_id)
+        if cached is not None:
+            return cached['user_type'], bool(cached['is_blocked'])
+        
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT user_type, is_blocked FROM users
+                    WHERE telegram_id = ?
+                    LIMIT 1
+                """, (telegram_id,))
+                
+                row = cursor.fetchone()
+                
+                if row:
+                    return row['user_type'], bool(row['is_blocked'])
+                
+                return None
+        
+        except Exception as e:
+            logger.error("❌ خطأ في جلب حالة المستخدم: %s", e)
+            return None
+    
+    @staticmethod
+    def invalidate_user(telegram_id: int) -> None:
+        """
+        حذف المستخدم من الذاكرة المؤقتة بعد تعديل بياناته
+        
+        Args:
+            telegram_id: معرف تلغرام
+        """
+        _user_cache.pop(telegram_id)
+    
     @staticmethod
     def update_user(
         telegram_id: int,
@@ -189,25 +310,29 @@ class UserDatabase:
             
             params.append(telegram_id)
             
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 query = f"""
                     UPDATE users
-                    SET {', '.join(updates)}, last_active = CURRENT_TIMESTAMP
+                    SET {', '.join(updates)}, last_active = CAST(strftime('%s', 'now') AS INTEGER)
                     WHERE telegram_id = ?
                 """
                 
                 cursor.execute(query, params)
                 conn.commit()
                 
+                # اسم المستخدم يظهر أيضاً في معلومات الشعبة (admin_name)
+                UserDatabase.invalidate_user(telegram_id)
+                _section_cache.clear()
+                
                 if cursor.rowcount > 0:
                     return True, "تم تحديث المستخدم بنجاح"
                 else:
                     return False, "المستخدم غير موجود"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في تحديث المستخدم: {e}")
+            logger.error("❌ خطأ في تحديث المستخدم: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -223,7 +348,7 @@ class UserDatabase:
             (نجاح: bool, رسالة: str)
         """
         try:
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # تحديث حالة الحظر
@@ -246,12 +371,13 @@ class UserDatabase:
                 )
                 
                 conn.commit()
+                UserDatabase.invalidate_user(telegram_id)
                 
-                logger.info(f"✅ تم حظر المستخدم: {telegram_id}")
+                logger.info("✅ تم حظر المستخدم: %s", telegram_id)
                 return True, "تم حظر المستخدم بنجاح"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في حظر المستخدم: {e}")
+            logger.error("❌ خطأ في حظر المستخدم: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -267,7 +393,7 @@ class UserDatabase:
             (نجاح: bool, رسالة: str)
         """
         try:
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -289,12 +415,13 @@ class UserDatabase:
                 )
                 
                 conn.commit()
+                UserDatabase.invalidate_user(telegram_id)
                 
-                logger.info(f"✅ تم إلغاء حظر المستخدم: {telegram_id}")
+                logger.info("✅ تم إلغاء حظر المستخدم: %s", telegram_id)
                 return True, "تم إلغاء الحظر بنجاح"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في إلغاء حظر المستخدم: {e}")
+            logger.error("❌ خطأ في إلغاء حظر المستخدم: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -324,7 +451,7 @@ class UserDatabase:
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب المستخدم: {e}")
+            logger.error("❌ خطأ في جلب المستخدم: %s", e)
             return None
 
 
@@ -362,7 +489,7 @@ class SectionDatabase:
             if division not in Config.DIVISIONS:
                 return False, "الشعبة غير صحيحة", None
             
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على اسم المرحلة
@@ -425,13 +552,13 @@ class SectionDatabase:
                     'join_link': f"https://t.me/{Config.BOT_USERNAME}?start={join_code}"
                 }
                 
-                logger.info(f"✅ تم إنشاء شعبة جديدة: {section_name}")
+                logger.info("✅ تم إنشاء شعبة جديدة: %s", section_name)
                 return True, "تم إنشاء الشعبة بنجاح", section_info
                 
         except sqlite3.IntegrityError:
             return False, "الشعبة موجودة مسبقاً", None
         except Exception as e:
-            logger.error(f"❌ خطأ في إنشاء الشعبة: {e}")
+            logger.error("❌ خطأ في إنشاء الشعبة: %s", e)
             return False, f"خطأ غير متوقع: {e}", None
     
     @staticmethod
@@ -445,26 +572,34 @@ class SectionDatabase:
         Returns:
             قاموس يحتوي على معلومات الشعبة أو None
         """
+        cache_key = ('code', join_code)
+        cached = _section_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
-                    SELECT s.*, al.level_name
+                    SELECT s.*, al.level_name, u.telegram_id as admin_telegram_id
                     FROM sections s
                     JOIN academic_levels al ON s.level_id = al.level_id
+                    LEFT JOIN users u ON s.admin_id = u.user_id
                     WHERE s.join_code = ? AND s.is_active = 1
                 """, (join_code,))
                 
                 row = cursor.fetchone()
                 
                 if row:
-                    return dict(row)
+                    section = dict(row)
+                    _section_cache.set(cache_key, section)
+                    return dict(section)
                 
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الشعبة: {e}")
+            logger.error("❌ خطأ في جلب الشعبة: %s", e)
             return None
     
     @staticmethod
@@ -478,12 +613,18 @@ class SectionDatabase:
         Returns:
             قاموس يحتوي على معلومات الشعبة أو None
         """
+        cache_key = ('id', section_id)
+        cached = _section_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
-                    SELECT s.*, al.level_name, u.full_name as admin_name
+                    SELECT s.*, al.level_name, u.full_name as admin_name,
+                           u.telegram_id as admin_telegram_id
                     FROM sections s
                     JOIN academic_levels al ON s.level_id = al.level_id
                     LEFT JOIN users u ON s.admin_id = u.user_id
@@ -493,12 +634,14 @@ class SectionDatabase:
                 row = cursor.fetchone()
                 
                 if row:
-                    return dict(row)
+                    section = dict(row)
+                    _section_cache.set(cache_key, section)
+                    return dict(section)
                 
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الشعبة: {e}")
+            logger.error("❌ خطأ في جلب الشعبة: %s", e)
             return None
     
     @staticmethod
@@ -529,7 +672,7 @@ class SectionDatabase:
                 return [dict(row) for row in rows]
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب شعب الأدمن: {e}")
+            logger.error("❌ خطأ في جلب شعب الأدمن: %s", e)
             return []
     
     @staticmethod
@@ -558,7 +701,7 @@ class SectionDatabase:
                 return [dict(row) for row in rows]
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب جميع الشعب: {e}")
+            logger.error("❌ خطأ في جلب جميع الشعب: %s", e)
             return []
 
 
@@ -592,7 +735,7 @@ class StudentDatabase:
             if not is_valid:
                 return False, error
             
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على معلومات الشعبة
@@ -667,11 +810,11 @@ class StudentDatabase:
                 
                 conn.commit()
                 
-                logger.info(f"✅ طلب تسجيل جديد: {full_name} في الشعبة {section_id}")
+                logger.info("✅ طلب تسجيل جديد: %s في الشعبة %s", full_name, section_id)
                 return True, "تم إرسال طلب التسجيل بنجاح"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في تسجيل الطالب: {e}")
+            logger.error("❌ خطأ في تسجيل الطالب: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -700,7 +843,7 @@ class StudentDatabase:
             if not has_permission:
                 return False, error
             
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على معرفات المستخدمين
@@ -724,7 +867,7 @@ class StudentDatabase:
                 cursor.execute("""
                     UPDATE student_sections
                     SET registration_status = 'approved',
-                        approved_at = CURRENT_TIMESTAMP,
+                        approved_at = CAST(strftime('%s', 'now') AS INTEGER),
                         approved_by = ?
                     WHERE student_id = ? AND section_id = ? AND registration_status = 'pending'
                 """, (admin_id, student_id, section_id))
@@ -743,11 +886,11 @@ class StudentDatabase:
                 
                 conn.commit()
                 
-                logger.info(f"✅ تمت الموافقة على الطالب: {student_id} في الشعبة {section_id}")
+                logger.info("✅ تمت الموافقة على الطالب: %s في الشعبة %s", student_id, section_id)
                 return True, "تمت الموافقة على الطالب بنجاح"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في الموافقة على الطالب: {e}")
+            logger.error("❌ خطأ في الموافقة على الطالب: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -776,7 +919,7 @@ class StudentDatabase:
             if not has_permission:
                 return False, error
             
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على معرفات المستخدمين
@@ -817,11 +960,11 @@ class StudentDatabase:
                 
                 conn.commit()
                 
-                logger.info(f"✅ تم رفض الطالب: {student_id} في الشعبة {section_id}")
+                logger.info("✅ تم رفض الطالب: %s في الشعبة %s", student_id, section_id)
                 return True, "تم رفض الطالب"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في رفض الطالب: {e}")
+            logger.error("❌ خطأ في رفض الطالب: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -852,7 +995,42 @@ class StudentDatabase:
                 return [dict(row) for row in rows]
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الطلاب المعلقين: {e}")
+            logger.error("❌ خطأ في جلب الطلاب المعلقين: %s", e)
+            return []
+    
+    @staticmethod
+    def get_pending_students_for_admin(admin_telegram_id: int) -> List[Dict[str, Any]]:
+        """
+        الحصول على الطلاب المعلقين في جميع شعب الأدمن باستعلام واحد
+        
+        Args:
+            admin_telegram_id: معرف تلغرام للأدمن
+        
+        Returns:
+            قائمة من القواميس تحتوي على معلومات الطلاب مع section_id و section_name
+        """
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT u.*, ss.registered_at, s.section_id, s.section_name
+                    FROM student_sections ss
+                    JOIN users u ON ss.student_id = u.user_id
+                    JOIN sections s ON ss.section_id = s.section_id
+                    JOIN users a ON s.admin_id = a.user_id
+                    WHERE a.telegram_id = ?
+                      AND s.is_active = 1
+                      AND ss.registration_status = 'pending'
+                    ORDER BY s.section_id, ss.registered_at DESC
+                """, (admin_telegram_id,))
+                
+                rows = cursor.fetchall()
+                
+                return [dict(row) for row in rows]
+        
+        except Exception as e:
+            logger.error("❌ خطأ في جلب الطلاب المعلقين: %s", e)
             return []
     
     @staticmethod
@@ -886,7 +1064,7 @@ class StudentDatabase:
                 return [dict(row) for row in rows]
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الطلاب الموافق عليهم: {e}")
+            logger.error("❌ خطأ في جلب الطلاب الموافق عليهم: %s", e)
             return []
     
     @staticmethod
@@ -923,7 +1101,7 @@ class StudentDatabase:
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب شعبة الطالب: {e}")
+            logger.error("❌ خطأ في جلب شعبة الطالب: %s", e)
             return None
 
 
@@ -973,7 +1151,7 @@ class AssignmentDatabase:
             if not has_permission:
                 return False, error, None
             
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على معرف الأدمن
@@ -1005,7 +1183,7 @@ class AssignmentDatabase:
                     (section_id, subject_id, title, description, deadline, created_by)
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, (section_id, subject_id, title, description, 
-                      deadline.isoformat(), admin_id))
+                      DateTimeHelper.to_timestamp(deadline), admin_id))
                 
                 assignment_id = cursor.lastrowid
                 
@@ -1020,11 +1198,11 @@ class AssignmentDatabase:
                 
                 conn.commit()
                 
-                logger.info(f"✅ تم إنشاء واجب جديد: {title} في الشعبة {section_id}")
+                logger.info("✅ تم إنشاء واجب جديد: %s في الشعبة %s", title, section_id)
                 return True, "تم إنشاء الواجب بنجاح", assignment_id
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في إنشاء الواجب: {e}")
+            logger.error("❌ خطأ في إنشاء الواجب: %s", e)
             return False, f"خطأ غير متوقع: {e}", None
     
     @staticmethod
@@ -1066,7 +1244,7 @@ class AssignmentDatabase:
                 return [dict(row) for row in rows]
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الواجبات: {e}")
+            logger.error("❌ خطأ في جلب الواجبات: %s", e)
             return []
     
     @staticmethod
@@ -1091,7 +1269,7 @@ class AssignmentDatabase:
             (نجاح: bool, رسالة: str)
         """
         try:
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على الواجب الحالي
@@ -1151,13 +1329,13 @@ class AssignmentDatabase:
                     if not is_valid:
                         return False, error
                     updates.append("deadline = ?")
-                    params.append(deadline.isoformat())
+                    params.append(DateTimeHelper.to_timestamp(deadline))
                 
                 if not updates:
                     return False, "لا توجد تحديثات"
                 
                 updates.append("is_edited = 1")
-                updates.append("updated_at = CURRENT_TIMESTAMP")
+                updates.append("updated_at = CAST(strftime('%s', 'now') AS INTEGER)")
                 params.append(assignment_id)
                 
                 query = f"""
@@ -1179,11 +1357,11 @@ class AssignmentDatabase:
                 
                 conn.commit()
                 
-                logger.info(f"✅ تم تعديل الواجب: {assignment_id}")
+                logger.info("✅ تم تعديل الواجب: %s", assignment_id)
                 return True, "تم تعديل الواجب بنجاح"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في تعديل الواجب: {e}")
+            logger.error("❌ خطأ في تعديل الواجب: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -1202,7 +1380,7 @@ class AssignmentDatabase:
             (نجاح: bool, رسالة: str)
         """
         try:
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على الواجب
@@ -1252,11 +1430,11 @@ class AssignmentDatabase:
                 
                 conn.commit()
                 
-                logger.info(f"✅ تم حذف الواجب: {assignment_id}")
+                logger.info("✅ تم حذف الواجب: %s", assignment_id)
                 return True, "تم حذف الواجب بنجاح"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في حذف الواجب: {e}")
+            logger.error("❌ خطأ في حذف الواجب: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -1290,8 +1468,60 @@ class AssignmentDatabase:
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الواجب: {e}")
+            logger.error("❌ خطأ في جلب الواجب: %s", e)
             return None
+    
+    @staticmethod
+    def get_assignment_with_recipients(
+        assignment_id: int
+    ) -> Tuple[Optional[Dict[str, Any]], List[int]]:
+        """
+        الحصول على الواجب ومعرفات تلغرام للطلاب الموافق عليهم في شعبته باستعلام واحد
+        
+        Args:
+            assignment_id: معرف الواجب
+        
+        Returns:
+            (قاموس الواجب أو None, قائمة معرفات تلغرام للطلاب)
+        """
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # LEFT JOIN حتى يُرجع الواجب حتى لو لم يكن في الشعبة طلاب
+                cursor.execute("""
+                    SELECT a.*, sub.subject_name, u.telegram_id AS recipient_telegram_id
+                    FROM assignments a
+                    JOIN subjects sub ON a.subject_id = sub.subject_id
+                    LEFT JOIN student_sections ss
+                        ON ss.section_id = a.section_id
+                       AND ss.registration_status = 'approved'
+                       AND ss.is_active = 1
+                    LEFT JOIN users u
+                        ON ss.student_id = u.user_id
+                       AND u.is_blocked = 0
+                    WHERE a.assignment_id = ?
+                    ORDER BY u.full_name
+                """, (assignment_id,))
+                
+                rows = cursor.fetchall()
+                
+                if not rows:
+                    return None, []
+                
+                assignment = dict(rows[0])
+                del assignment['recipient_telegram_id']
+                
+                recipients = [
+                    row['recipient_telegram_id'] for row in rows
+                    if row['recipient_telegram_id'] is not None
+                ]
+                
+                return assignment, recipients
+        
+        except Exception as e:
+            logger.error("❌ خطأ في جلب الواجب والطلاب: %s", e)
+            return None, []
 
 
 # ==================== دوال الإشعارات ====================
@@ -1319,35 +1549,70 @@ class NotificationDatabase:
             (نجاح: bool, رسالة: str)
         """
         try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                # الحصول على معرف الطالب
-                cursor.execute("""
-                    SELECT user_id FROM users WHERE telegram_id = ?
-                """, (student_telegram_id,))
-                student_row = cursor.fetchone()
-                
-                if not student_row:
-                    return False, "الطالب غير موجود"
-                
-                student_id = student_row['user_id']
-                
-                # تسجيل الإشعار
-                cursor.execute("""
-                    INSERT INTO assignment_notifications
-                    (assignment_id, student_id, notification_type, delivery_status)
-                    VALUES (?, ?, ?, ?)
-                """, (assignment_id, student_id, notification_type, delivery_status))
-                
-                conn.commit()
-                
-                return True, "تم تسجيل الإشعار"
-                
+            inserted = NotificationDatabase._insert_notifications(
+                [(assignment_id, student_telegram_id, notification_type, delivery_status)]
+            )
+            
+            if not inserted:
+                return False, "الطالب غير موجود"
+            
+            return True, "تم تسجيل الإشعار"
+        
         except Exception as e:
-            logger.error(f"❌ خطأ في تسجيل الإشعار: {e}")
+            logger.error("❌ خطأ في تسجيل الإشعار: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
+    @staticmethod
+    def log_notifications_bulk(
+        notifications: List[Tuple[int, int, str, str]]
+    ) -> Tuple[bool, str]:
+        """
+        تسجيل مجموعة إشعارات دفعة واحدة في معاملة واحدة
+        
+        Args:
+            notifications: قائمة من (معرف الواجب, معرف تلغرام للطالب,
+                           نوع الإشعار, حالة التوصيل)
+        
+        Returns:
+            (نجاح: bool, رسالة: str)
+        """
+        if not notifications:
+            return True, "لا توجد إشعارات للتسجيل"
+        
+        try:
+            inserted = NotificationDatabase._insert_notifications(notifications)
+            return True, f"تم تسجيل {inserted} إشعار"
+        
+        except Exception as e:
+            logger.error("❌ خطأ في تسجيل الإشعارات: %s", e)
+            return False, f"خطأ غير متوقع: {e}"
+    
+    @staticmethod
+    def _insert_notifications(notifications: List[Tuple[int, int, str, str]]) -> int:
+        """
+        إدراج سجلات الإشعارات بعبارة executemany واحدة في معاملة واحدة
+        
+        Args:
+            notifications: قائمة من (معرف الواجب, معرف تلغرام للطالب,
+                           نوع الإشعار, حالة التوصيل)
+        
+        Returns:
+            عدد السجلات المدرجة (الطلاب غير الموجودين يُتجاوزون)
+        """
+        with get_db_write_connection() as conn:
+            cursor = conn.cursor()
+            
+            # معرف الطالب يُستخرج من جدول المستخدمين داخل نفس الاستعلام
+            cursor.executemany("""
+                INSERT INTO assignment_notifications
+                (assignment_id, student_id, notification_type, delivery_status)
+                SELECT ?1, user_id, ?3, ?4 FROM users WHERE telegram_id = ?2
+            """, notifications)
+            
+            conn.commit()
+            
+            return cursor.rowcount
+    
     @staticmethod
     def get_notification_stats(assignment_id: int) -> Dict[str, int]:
         """
@@ -1383,7 +1648,7 @@ class NotificationDatabase:
                 }
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب إحصائيات الإشعارات: {e}")
+            logger.error("❌ خطأ في جلب إحصائيات الإشعارات: %s", e)
             return {'total': 0, 'sent': 0, 'failed': 0, 'blocked': 0}
 
 
@@ -1416,7 +1681,7 @@ class ActivityDatabase:
             (نجاح: bool, رسالة: str)
         """
         try:
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -1430,7 +1695,7 @@ class ActivityDatabase:
                 return True, "تم تسجيل الحدث"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في تسجيل الحدث: {e}")
+            logger.error("❌ خطأ في تسجيل الحدث: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -1461,7 +1726,7 @@ class ActivityDatabase:
                 return [dict(row) for row in rows]
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الأحداث: {e}")
+            logger.error("❌ خطأ في جلب الأحداث: %s", e)
             return []
 
 
@@ -1522,7 +1787,7 @@ class StatisticsDatabase:
                 return stats
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب إحصائيات المالك: {e}")
+            logger.error("❌ خطأ في جلب إحصائيات المالك: %s", e)
             return {}
     
     @staticmethod
@@ -1591,7 +1856,7 @@ class StatisticsDatabase:
                 return stats
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب إحصائيات الأدمن: {e}")
+            logger.error("❌ خطأ في جلب إحصائيات الأدمن: %s", e)
             return {}
 
 
@@ -1627,7 +1892,7 @@ class SettingsDatabase:
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في جلب الإعداد: {e}")
+            logger.error("❌ خطأ في جلب الإعداد: %s", e)
             return None
     
     @staticmethod
@@ -1648,12 +1913,12 @@ class SettingsDatabase:
             (نجاح: bool, رسالة: str)
         """
         try:
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
                     UPDATE bot_settings
-                    SET setting_value = ?, updated_at = CURRENT_TIMESTAMP
+                    SET setting_value = ?, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
                     WHERE setting_key = ?
                 """, (setting_value, setting_key))
                 
@@ -1672,7 +1937,7 @@ class SettingsDatabase:
                 return True, "تم تحديث الإعداد بنجاح"
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في تعيين الإعداد: {e}")
+            logger.error("❌ خطأ في تعيين الإعداد: %s", e)
             return False, f"خطأ غير متوقع: {e}"
     
     @staticmethod
@@ -1688,7 +1953,7 @@ class SettingsDatabase:
             (نجاح: bool, رسالة: str, الحالة الجديدة: bool)
         """
         try:
-            with get_db_connection() as conn:
+            with get_db_write_connection() as conn:
                 cursor = conn.cursor()
                 
                 # الحصول على الحالة الحالية
@@ -1707,7 +1972,7 @@ class SettingsDatabase:
                 # تحديث الحالة
                 cursor.execute("""
                     UPDATE bot_features
-                    SET is_enabled = ?, updated_at = CURRENT_TIMESTAMP
+                    SET is_enabled = ?, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
                     WHERE feature_key = ?
                 """, (new_status, feature_key))
                 
@@ -1724,7 +1989,7 @@ class SettingsDatabase:
                 return True, f"تم {status_text} الميزة", bool(new_status)
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في تبديل الميزة: {e}")
+            logger.error("❌ خطأ في تبديل الميزة: %s", e)
             return False, f"خطأ غير متوقع: {e}", False
     
     @staticmethod
@@ -1754,19 +2019,23 @@ class SettingsDatabase:
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ خطأ في التحقق من الميزة: {e}")
+            logger.error("❌ خطأ في التحقق من الميزة: %s", e)
             return False
 
 
 # ==================== دوال مساعدة عامة ====================
 
-def get_academic_levels() -> List[Dict[str, Any]]:
+def _load_academic_levels() -> Optional[Dict[int, Dict[str, Any]]]:
     """
-    الحصول على قائمة المراحل الدراسية
+    تحميل المراحل الدراسية النشطة إلى الذاكرة المؤقتة
     
     Returns:
-        قائمة من القواميس تحتوي على المراحل الدراسية
+        قاموس {level_id: المرحلة} بترتيب level_number أو None عند الخطأ
     """
+    levels = _reference_cache.get('levels')
+    if levels is not None:
+        return levels
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -1779,11 +2048,44 @@ def get_academic_levels() -> List[Dict[str, Any]]:
             
             rows = cursor.fetchall()
             
-            return [dict(row) for row in rows]
+            levels = {row['level_id']: dict(row) for row in rows}
+            _reference_cache.set('levels', levels)
+            return levels
             
     except Exception as e:
-        logger.error(f"❌ خطأ في جلب المراحل الدراسية: {e}")
+        logger.error("❌ خطأ في جلب المراحل الدراسية: %s", e)
+        return None
+
+
+def get_academic_levels() -> List[Dict[str, Any]]:
+    """
+    الحصول على قائمة المراحل الدراسية
+    
+    Returns:
+        قائمة من القواميس تحتوي على المراحل الدراسية
+    """
+    levels = _load_academic_levels()
+    if not levels:
         return []
+    
+    return [dict(level) for level in levels.values()]
+
+
+def get_academic_level(level_id: int) -> Optional[Dict[str, Any]]:
+    """
+    الحصول على مرحلة دراسية نشطة بواسطة المعرف
+    
+    Args:
+        level_id: معرف المرحلة
+    
+    Returns:
+        قاموس يحتوي على معلومات المرحلة أو None
+    """
+    levels = _load_academic_levels()
+    if not levels or level_id not in levels:
+        return None
+    
+    return dict(levels[level_id])
 
 
 def get_subjects() -> List[Dict[str, Any]]:
@@ -1793,6 +2095,10 @@ def get_subjects() -> List[Dict[str, Any]]:
     Returns:
         قائمة من القواميس تحتوي على المواد
     """
+    subjects = _reference_cache.get('subjects')
+    if subjects is not None:
+        return [dict(subject) for subject in subjects]
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -1805,13 +2111,20 @@ def get_subjects() -> List[Dict[str, Any]]:
             
             rows = cursor.fetchall()
             
-            return [dict(row) for row in rows]
+            subjects = [dict(row) for row in rows]
+            _reference_cache.set('subjects', subjects)
+            return [dict(subject) for subject in subjects]
             
     except Exception as e:
-        logger.error(f"❌ خطأ في جلب المواد: {e}")
+        logger.error("❌ خطأ في جلب المواد: %s", e)
         return []
 
 
+def invalidate_reference_data() -> None:
+    """إبطال الذاكرة المؤقتة للمراحل والمواد بعد تعديلها"""
+    _reference_cache.clear()
+
+
 def get_subjects_for_stage(stage_id: int) -> List[Dict[str, Any]]:
     """
     الحصول على قائمة المواد لمرحلة معينة
@@ -1844,7 +2157,7 @@ def get_subjects_for_stage(stage_id: int) -> List[Dict[str, Any]]:
             return [dict(row) for row in rows]
             
     except Exception as e:
-        logger.error(f"❌ خطأ في جلب مواد المرحلة: {e}")
+        logger.error("❌ خطأ في جلب مواد المرحلة: %s", e)
         return []
 
 
@@ -8,11 +8,22 @@
 import secrets
 import hashlib
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Optional, Tuple
 import pytz
 import re
 
+# أنماط التحقق تُترجم مرة واحدة عند تحميل الوحدة
+_USERNAME_RE = re.compile(r'^@[a-zA-Z0-9_]{5,32}$', re.ASCII)
+_SECTION_CODE_RE = re.compile(r'^SEC_[a-zA-Z0-9]{12}$', re.ASCII)
+# صيغتا التاريخ YYYY-MM-DD والوقت HH:MM ثابتتان، فتُقرأ أجزاؤهما مباشرة دون strptime
+_DATE_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})', re.ASCII)
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{1,2})', re.ASCII)
+
 
 class CodeGenerator:
     """كلاس لتوليد الأكواد الفريدة"""
@@ -107,6 +118,7 @@ class DateTimeHelper:
         return datetime.now(DateTimeHelper.TIMEZONE)
     
     @staticmethod
+    @lru_cache(maxsize=512)
     def format_datetime(dt: datetime, include_time: bool = True) -> str:
         """
         تنسيق التاريخ والوقت للعرض بالعربية
@@ -148,11 +160,21 @@ class DateTimeHelper:
             datetime(2025, 10, 20, 23, 59)
         """
         try:
+            date_match = _DATE_RE.fullmatch(date_str)
+            if not date_match:
+                return None
+            
+            hour = minute = 0
             if time_str:
-                datetime_str = f"{date_str} {time_str}"
-                dt = datetime.strptime(datetime_str, '%Y-%m-%d %H:%M')
-            else:
-                dt = datetime.strptime(date_str, '%Y-%m-%d')
+                time_match = _TIME_RE.fullmatch(time_str)
+                if not time_match:
+                    return None
+                hour, minute = int(time_match[1]), int(time_match[2])
+            
+            dt = datetime(
+                int(date_match[1]), int(date_match[2]), int(date_match[3]),
+                hour, minute
+            )
             
             # إضافة المنطقة الزمنية
             dt = DateTimeHelper.TIMEZONE.localize(dt)
@@ -161,6 +183,38 @@ class DateTimeHelper:
         except Exception:
             return None
     
+    @staticmethod
+    def to_timestamp(dt: datetime) -> int:
+        """
+        تحويل التاريخ إلى Unix timestamp (ثوانٍ) لتخزينه في قاعدة البيانات
+        
+        Args:
+            dt: كائن datetime (يُفضّل أن يحمل المنطقة الزمنية)
+        
+        Returns:
+            عدد الثواني منذ 1970-01-01 UTC
+        """
+        return int(dt.timestamp())
+    
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def from_timestamp(value) -> datetime:
+        """
+        تحويل قيمة مخزنة في قاعدة البيانات إلى datetime بالمنطقة الزمنية المحلية
+        
+        النتائج تُحفظ مؤقتاً لأن نفس المواعيد تتكرر في القوائم والإشعارات
+        
+        Args:
+            value: Unix timestamp، أو نص ISO (بيانات قديمة قبل التحويل)
+        
+        Returns:
+            كائن datetime بالمنطقة الزمنية المحددة
+        """
+        if isinstance(value, str):
+            return datetime.fromisoformat(value)
+        
+        return datetime.fromtimestamp(value, DateTimeHelper.TIMEZONE)
+    
     @staticmethod
     def is_deadline_passed(deadline: datetime) -> bool:
         """
@@ -331,6 +385,33 @@ class MessageFormatter:
 """
         return message.strip()
     
+    @staticmethod
+    def format_registration_batch_message(
+        requests: list,
+        title: str = "🆕 طلبات تسجيل جديدة"
+    ) -> str:
+        """
+        تنسيق عدة طلبات تسجيل في رسالة واحدة للأدمن
+        
+        Args:
+            requests: قائمة من القواميس تحتوي على (full_name, username, telegram_id, section_name)
+            title: عنوان الرسالة
+        
+        Returns:
+            رسالة منسقة
+        """
+        lines = [f"{title} ({len(requests)})", ""]
+        
+        for i, request in enumerate(requests, 1):
+            username_part = f"@{request['username']}" if request['username'] else "بدون username"
+            lines.append(f"{i}. 👤 {request['full_name']} ({username_part})")
+            lines.append(f"   🔢 ID: {request['telegram_id']} | 📚 {request['section_name']}")
+        
+        lines.append("")
+        lines.append(f"⏰ {DateTimeHelper.format_datetime(DateTimeHelper.get_current_datetime())}")
+        
+        return "\n".join(lines)
+    
     @staticmethod
     def format_student_list(students: list) -> str:
         """
@@ -422,8 +503,7 @@ class Validator:
             return True  # اسم المستخدم اختياري
         
         # اسم المستخدم يجب أن يبدأ بـ @ ويحتوي على 5-32 حرف
-        pattern = r'^@[a-zA-Z0-9_]{5,32}$'
-        return bool(re.match(pattern, username))
+        return bool(_USERNAME_RE.match(username))
     
     @staticmethod
     def validate_full_name(full_name: str) -> Tuple[bool, str]:
@@ -459,8 +539,7 @@ class Validator:
             True إذا كان صحيح
         """
         # الكود يجب أن يبدأ بـ SEC_ ويحتوي على 12 حرف بعدها
-        pattern = r'^SEC_[a-zA-Z0-9]{12}$'
-        return bool(re.match(pattern, code))
+        return bool(_SECTION_CODE_RE.match(code))
     
     @staticmethod
     def validate_assignment_title(title: str) -> Tuple[bool, str]:
@@ -546,24 +625,47 @@ class PermissionChecker:
             
             user_type, is_active, is_blocked = result
             
-            if not is_active:
-                return False, "الحساب غير نشط"
-            
-            if is_blocked:
-                return False, "أنت محظور من استخدام البوت"
-            
-            # المالك لديه كل الصلاحيات
-            if user_type == 'owner':
-                return True, None
-            
-            if user_type == required_type:
-                return True, None
-            
-            return False, f"تحتاج إلى صلاحية {required_type}"
+            return PermissionChecker.check_user_record_permission(
+                {'user_type': user_type, 'is_active': is_active, 'is_blocked': is_blocked},
+                required_type
+            )
             
         except Exception as e:
             return False, f"خطأ في التحقق من الصلاحيات: {e}"
     
+    @staticmethod
+    def check_user_record_permission(
+        user: Optional[Dict[str, Any]],
+        required_type: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        التحقق من صلاحيات مستخدم تم جلب بياناته مسبقاً
+        
+        Args:
+            user: قاموس المستخدم (user_type, is_active, is_blocked) أو None
+            required_type: نوع الصلاحية المطلوبة (owner/admin/student)
+        
+        Returns:
+            (لديه صلاحية: bool, سبب الرفض: str أو None)
+        """
+        if not user:
+            return False, "المستخدم غير موجود"
+        
+        if not user['is_active']:
+            return False, "الحساب غير نشط"
+        
+        if user['is_blocked']:
+            return False, "أنت محظور من استخدام البوت"
+        
+        # المالك لديه كل الصلاحيات
+        if user['user_type'] == 'owner':
+            return True, None
+        
+        if user['user_type'] == required_type:
+            return True, None
+        
+        return False, f"تحتاج إلى صلاحية {required_type}"
+    
     @staticmethod
     def check_admin_section_permission(
         db_path: str,
@@ -625,6 +727,117 @@ class PermissionChecker:
             return False, f"خطأ في التحقق من الصلاحيات: {e}"
 
 
+class TTLCache:
+    """
+    ذاكرة مؤقتة بمدة صلاحية وحد أقصى للحجم (آمنة مع الخيوط)
+    
+    عند امتلاء الذاكرة يُحذف العنصر الأقدم استخداماً (LRU)
+    """
+    
+    def __init__(self, ttl_seconds: float, max_size: int = 10000):
+        """
+        Args:
+            ttl_seconds: مدة صلاحية العنصر (بالثواني)
+            max_size: الحد الأقصى لعدد العناصر
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        الحصول على قيمة من الذاكرة المؤقتة
+        
+        Args:
+            key: المفتاح
+        
+        Returns:
+            القيمة أو None إذا لم تكن موجودة أو انتهت صلاحيتها
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            
+            self._items.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        حفظ قيمة في الذاكرة المؤقتة
+        
+        Args:
+            key: المفتاح
+            value: القيمة
+        """
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._items.move_to_end(key)
+            
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+    
+    def pop(self, key: Hashable) -> None:
+        """
+        حذف مفتاح من الذاكرة المؤقتة (إن وجد)
+        
+        Args:
+            key: المفتاح
+        """
+        with self._lock:
+            self._items.pop(key, None)
+    
+    def clear(self) -> None:
+        """مسح جميع العناصر"""
+        with self._lock:
+            self._items.clear()
+
+
+class TokenBucket:
+    """
+    محدد معدل (Token Bucket) مشترك بين الخيوط
+    
+    يمتلئ بمعدل rate رمز في الثانية حتى capacity، وكل عملية تستهلك رمزاً واحداً
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: عدد الرموز المضافة في الثانية
+            capacity: الحد الأقصى للرموز المتراكمة (افتراضياً يساوي rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """الانتظار حتى يتوفر رمز ثم استهلاكه"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                wait = (1 - self._tokens) / self.rate
+            
+            time.sleep(wait)
+
+
 # ==================== أمثلة الاستخدام ====================
 
 if __name__ == "__main__":
@@ -664,7 +877,7 @@ if __name__ == "__main__":
     is_valid, error = Validator.validate_full_name("أحمد محمد علي")
     print(f"   الاسم صحيح: {is_valid}")
     
-    is_valid, error = Validator.validate_section_code(code)
+    is_valid = Validator.validate_section_code(code)
     print(f"   الكود صحيح: {is_valid}")
     
     print("\n" + "=" * 60)
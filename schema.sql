@@ -0,0 +1,194 @@
+-- مخطط قاعدة بيانات بوت التلغرام الجامعي
+-- يُقرأ من create_database.py، ويمكن تطبيقه مباشرة للنشر أو CI:
+--     sqlite3 university_bot.db < schema.sql
+-- (البيانات الأولية وإعدادات PRAGMA تُضاف عبر create_database.py)
+-- الأوقات تُخزن كـ Unix timestamp (INTEGER) بتوقيت UTC
+
+-- ==================== جدول المستخدمين ====================
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    telegram_id INTEGER UNIQUE NOT NULL,
+    username TEXT,
+    full_name TEXT NOT NULL,
+    user_type TEXT NOT NULL CHECK(user_type IN ('owner', 'admin', 'student')),
+    is_active INTEGER DEFAULT 1,
+    is_blocked INTEGER DEFAULT 0,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    last_active INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+
+-- ==================== جدول المراحل الدراسية ====================
+CREATE TABLE IF NOT EXISTS academic_levels (
+    level_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    level_name TEXT UNIQUE NOT NULL,
+    level_number INTEGER UNIQUE NOT NULL,
+    is_active INTEGER DEFAULT 1,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+
+-- ==================== جدول الشعب ====================
+CREATE TABLE IF NOT EXISTS sections (
+    section_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    section_name TEXT NOT NULL,
+    level_id INTEGER NOT NULL,
+    study_type TEXT NOT NULL CHECK(study_type IN ('صباحي', 'مسائي')),
+    division TEXT NOT NULL CHECK(division IN ('A', 'B')),
+    admin_id INTEGER,
+    join_code TEXT UNIQUE NOT NULL,
+    max_students INTEGER DEFAULT 50,
+    is_active INTEGER DEFAULT 1,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    FOREIGN KEY (level_id) REFERENCES academic_levels(level_id),
+    FOREIGN KEY (admin_id) REFERENCES users(user_id),
+    UNIQUE(level_id, study_type, division)
+);
+
+-- ==================== جدول الطلاب في الشعب ====================
+CREATE TABLE IF NOT EXISTS student_sections (
+    student_section_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    section_id INTEGER NOT NULL,
+    registration_status TEXT NOT NULL DEFAULT 'pending' 
+        CHECK(registration_status IN ('pending', 'approved', 'rejected')),
+    registered_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    approved_at INTEGER,
+    approved_by INTEGER,
+    is_active INTEGER DEFAULT 1,
+    FOREIGN KEY (student_id) REFERENCES users(user_id),
+    FOREIGN KEY (section_id) REFERENCES sections(section_id),
+    FOREIGN KEY (approved_by) REFERENCES users(user_id),
+    UNIQUE(student_id, section_id)
+);
+
+-- ==================== جدول المواد ====================
+CREATE TABLE IF NOT EXISTS subjects (
+    subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_name TEXT UNIQUE NOT NULL,
+    description TEXT,
+    is_active INTEGER DEFAULT 1,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+
+-- ==================== جدول ربط المواد بالمراحل ====================
+CREATE TABLE IF NOT EXISTS subjects_stages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_id INTEGER NOT NULL,
+    stage_id INTEGER NOT NULL,
+    is_active INTEGER DEFAULT 1,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE CASCADE,
+    FOREIGN KEY (stage_id) REFERENCES academic_levels(level_id) ON DELETE CASCADE,
+    UNIQUE(subject_id, stage_id)
+);
+
+-- ==================== جدول الواجبات ====================
+CREATE TABLE IF NOT EXISTS assignments (
+    assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    section_id INTEGER NOT NULL,
+    subject_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    deadline INTEGER NOT NULL,
+    created_by INTEGER NOT NULL,
+    is_active INTEGER DEFAULT 1,
+    is_edited INTEGER DEFAULT 0,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    FOREIGN KEY (section_id) REFERENCES sections(section_id),
+    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id),
+    FOREIGN KEY (created_by) REFERENCES users(user_id)
+);
+
+-- ==================== جدول تعديلات الواجبات ====================
+CREATE TABLE IF NOT EXISTS assignment_edits (
+    edit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    assignment_id INTEGER NOT NULL,
+    old_title TEXT,
+    old_description TEXT,
+    old_deadline INTEGER,
+    edited_by INTEGER NOT NULL,
+    edited_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id),
+    FOREIGN KEY (edited_by) REFERENCES users(user_id)
+);
+
+-- ==================== جدول إشعارات الواجبات ====================
+CREATE TABLE IF NOT EXISTS assignment_notifications (
+    notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    assignment_id INTEGER NOT NULL,
+    student_id INTEGER NOT NULL,
+    notification_type TEXT NOT NULL CHECK(notification_type IN ('new', 'edit', 'delete', 'reminder')),
+    sent_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    delivery_status TEXT DEFAULT 'sent' CHECK(delivery_status IN ('sent', 'failed', 'blocked')),
+    FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id),
+    FOREIGN KEY (student_id) REFERENCES users(user_id)
+);
+
+-- ==================== جدول السجلات ====================
+CREATE TABLE IF NOT EXISTS activity_logs (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    action_type TEXT NOT NULL,
+    action_details TEXT,
+    target_type TEXT,
+    target_id INTEGER,
+    ip_address TEXT,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    FOREIGN KEY (user_id) REFERENCES users(user_id)
+);
+
+-- ==================== جدول إعدادات البوت ====================
+CREATE TABLE IF NOT EXISTS bot_settings (
+    setting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    setting_key TEXT UNIQUE NOT NULL,
+    setting_value TEXT NOT NULL,
+    setting_type TEXT NOT NULL CHECK(setting_type IN ('string', 'integer', 'boolean', 'json')),
+    description TEXT,
+    updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+
+-- ==================== جدول الميزات ====================
+CREATE TABLE IF NOT EXISTS bot_features (
+    feature_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    feature_key TEXT UNIQUE NOT NULL,
+    feature_name TEXT NOT NULL,
+    is_enabled INTEGER DEFAULT 0,
+    description TEXT,
+    updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+
+-- ==================== الفهارس ====================
+-- تُنشأ في create_database.py بعد إضافة البيانات الأولية
+
+-- جدول المستخدمين
+CREATE INDEX IF NOT EXISTS idx_telegram_id ON users(telegram_id);
+CREATE INDEX IF NOT EXISTS idx_user_type ON users(user_type);
+
+-- جدول الشعب
+CREATE INDEX IF NOT EXISTS idx_join_code ON sections(join_code);
+CREATE INDEX IF NOT EXISTS idx_admin_id ON sections(admin_id);
+
+-- جدول الطلاب في الشعب
+CREATE INDEX IF NOT EXISTS idx_student_section ON student_sections(student_id, section_id);
+CREATE INDEX IF NOT EXISTS idx_registration_status ON student_sections(registration_status);
+-- طلاب الشعبة الفعّالون حسب حالة التسجيل (فهرس جزئي)
+CREATE INDEX IF NOT EXISTS idx_studsec_section_status ON student_sections(section_id, registration_status) WHERE is_active = 1;
+
+-- جدول ربط المواد بالمراحل
+CREATE INDEX IF NOT EXISTS idx_subject_stage ON subjects_stages(subject_id, stage_id);
+
+-- جدول الواجبات
+-- واجبات الشعبة مرتبة حسب الموعد النهائي (يغني عن idx_section_assignment)
+DROP INDEX IF EXISTS idx_section_assignment;
+CREATE INDEX IF NOT EXISTS idx_assignments_section_deadline ON assignments(section_id, deadline);
+CREATE INDEX IF NOT EXISTS idx_deadline ON assignments(deadline);
+
+-- جدول إشعارات الواجبات
+CREATE INDEX IF NOT EXISTS idx_assignment_notification ON assignment_notifications(assignment_id);
+-- إشعارات الطالب الأحدث أولاً (يغني عن idx_student_notification)
+DROP INDEX IF EXISTS idx_student_notification;
+CREATE INDEX IF NOT EXISTS idx_notif_student_time ON assignment_notifications(student_id, sent_at DESC);
+
+-- جدول السجلات
+CREATE INDEX IF NOT EXISTS idx_action_type ON activity_logs(action_type);
+CREATE INDEX IF NOT EXISTS idx_created_at ON activity_logs(created_at);